@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+from self_practice import CountryYearIndex
+
+
+# Per-country time-series metrics over the sorted layout. Each country run of
+# a CountryYearIndex is read in ascending year order (descending runs are
+# mirrored), and rolling means, year-over-year changes, cumulative totals and
+# the CAGR since the first year are derived from one cumulative sum with
+# segment offsets instead of per-group callbacks. extend_country_metrics only
+# looks at the last max(window - 1, 1) rows of the countries that received new
+# years.
+
+METRIC_COLUMNS = ("rolling_mean", "yoy_change", "yoy_pct", "cumulative", "cagr")
+
+
+def _segment_metrics(values, years, lengths, window, base_cum, first_value, first_year):
+    starts = np.cumsum(lengths) - lengths
+    pos = np.arange(len(values)) - np.repeat(starts, lengths)
+    missing = np.isnan(values)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, values))))
+    cnan = np.concatenate(([0], np.cumsum(missing)))
+    here = np.arange(1, len(values) + 1)
+    cumulative = csum[1:] - np.repeat(csum[starts], lengths) + np.repeat(base_cum, lengths)
+    cumulative[missing] = np.nan
+    back = np.maximum(here - window, 0)
+    full = (pos >= window - 1) & (cnan[here] == cnan[back])
+    rolling = np.where(full, (csum[here] - csum[back]) / window, np.nan)
+    previous = np.where(pos >= 1, np.roll(values, 1), np.nan)
+    change = values - previous
+    span = years - np.repeat(first_year, lengths)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = change / previous
+        cagr = np.where(span > 0, (values / np.repeat(first_value, lengths)) ** (1.0 / span) - 1,
+                        np.nan)
+    return dict(zip(METRIC_COLUMNS, (rolling, change, pct, cumulative, cagr)))
+
+
+def _ascending_order(index, n):
+    starts = np.array([start for start, _ in index.ranges.values()], dtype=np.int64)
+    stops = np.array([stop for _, stop in index.ranges.values()], dtype=np.int64)
+    order = np.argsort(starts)
+    starts, stops = starts[order], stops[order]
+    lengths = stops - starts
+    descending = index.years[starts] > index.years[stops - 1]
+    mirror = np.repeat(starts + stops - 1, lengths) - np.arange(n)
+    return np.where(np.repeat(descending, lengths), mirror, np.arange(n)), lengths
+
+
+def country_metrics(df, window=3, country="Country or Area", year="Year", value="Value",
+                    index=None):
+    index = index or CountryYearIndex(df, country, year)
+    perm, lengths = _ascending_order(index, len(df))
+    values = df[value].to_numpy(dtype=np.float64)[perm]
+    years = df[year].to_numpy()[perm]
+    starts = np.cumsum(lengths) - lengths
+    metrics = _segment_metrics(values, years, lengths, window, np.zeros(len(lengths)),
+                               values[starts] if len(values) else values, years[starts])
+    columns = {}
+    for name, column in metrics.items():
+        columns[name] = np.empty(len(df))
+        columns[name][perm] = column
+    return df.assign(**columns)
+
+
+def extend_country_metrics(metrics, new_rows, window=3, country="Country or Area",
+                           year="Year", value="Value", index=None):
+    index = index or CountryYearIndex(metrics, country, year)
+    new_rows = new_rows.iloc[np.lexsort((new_rows[year].to_numpy(),
+                                         pd.factorize(new_rows[country])[0]))]
+    values, years, lengths, keep = [], [], [], []
+    base_cum, first_value, first_year = [], [], []
+    for name, rows in new_rows.groupby(country, observed=True, sort=False):
+        add_values = rows[value].to_numpy(dtype=np.float64)
+        add_years = rows[year].to_numpy()
+        if name in index:
+            start, stop = index.ranges[name]
+            run = index.years[start:stop]
+            past = metrics.iloc[start:stop]
+            if run[0] > run[-1]:
+                past = past.iloc[::-1]
+            if add_years[0] <= past[year].iloc[-1]:
+                raise ValueError(f"new years for {name!r} must come after {past[year].iloc[-1]}")
+            # the rolling mean needs window - 1 earlier rows, the year-over-year
+            # change at least the last one
+            context = past.iloc[len(past) - min(max(window - 1, 1), len(past)):]
+            total = past["cumulative"].iloc[-1]
+            if np.isnan(total):
+                total = np.nansum(past[value].to_numpy(dtype=np.float64))
+            base_cum.append(total - np.nansum(context[value].to_numpy(dtype=np.float64)))
+            first_value.append(float(past[value].iloc[0]))
+            first_year.append(past[year].iloc[0])
+        else:
+            context = rows.iloc[:0]
+            base_cum.append(0.0)
+            first_value.append(add_values[0])
+            first_year.append(add_years[0])
+        values += [context[value].to_numpy(dtype=np.float64), add_values]
+        years += [context[year].to_numpy(), add_years]
+        keep += [np.zeros(len(context), dtype=bool), np.ones(len(rows), dtype=bool)]
+        lengths.append(len(context) + len(rows))
+    if not lengths:
+        return new_rows.assign(**{name: np.empty(0) for name in METRIC_COLUMNS})
+    computed = _segment_metrics(np.concatenate(values), np.concatenate(years),
+                                np.array(lengths), window, np.array(base_cum),
+                                np.array(first_value), np.array(first_year))
+    keep = np.concatenate(keep)
+    return new_rows.assign(**{name: column[keep] for name, column in computed.items()})
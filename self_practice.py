@@ -1,23 +1,1673 @@
+import bz2
+import contextlib
+import gzip
+import hashlib
+import json
+import lzma
+import mmap
+import multiprocessing
+import os
+import pickle
+import platform
+import tempfile
+import time
+import uuid
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
 import pandas as pd
 
 
-def load_csv(filepath):
+def load_csv(filepath, chunksize=None, dtypes=None, workers=None, engine="python",
+             validator=None):
+    if engine not in ("python", "mmap"):
+        raise ValueError(f"unknown engine {engine!r}, expected 'python' or 'mmap'")
+    dtypes = {**sniff_dtypes(filepath), **(dtypes or {})}
+    if chunksize is not None:
+        return iter_csv_chunks(filepath, chunksize, dtypes, validator)
+    # a validator checks every block as soon as it is parsed
+    if workers is not None and workers > 1:
+        return _load_csv_parallel(filepath, dtypes, workers, validator)
+    if engine == "mmap":
+        return _load_csv_mmap(filepath, dtypes, validator)
+    if validator is not None:
+        return concat_chunks(iter_csv_chunks(filepath, dtypes=dtypes, validator=validator))
+    return _load_csv_python(filepath, dtypes)
+
+
+def _load_csv_python(filepath, dtypes):
     data = []
     col = []
     checkcol = False
     with open(filepath) as f:
-        for val in f.readlines():
+        for val in f:
             val = val.replace("\n", "")
+            if not val:
+                continue
             val = val.split(',')
             if checkcol is False:
                 col = val
                 checkcol = True
             else:
                 data.append(val)
-    df = pd.DataFrame(data=data, columns=col)
+    return _typed_frame(data, col, dtypes=dtypes)
+
+
+# Type inference: a sample of the file decides the dtype of every column, so
+# that each column is parsed straight into an int64/float64/categorical array
+# instead of going through object columns and a later astype().
+
+def _kind_of(values):
+    present = [v for v in values if v != ""]
+    if not present:
+        return "object"
+    try:
+        [int(v) for v in present]
+        return "int64" if len(present) == len(values) else "float64"
+    except ValueError:
+        pass
+    try:
+        [float(v) for v in present]
+        return "float64"
+    except ValueError:
+        pass
+    if len(set(values)) <= len(values) // 2:
+        return "category"
+    return "object"
+
+
+def sniff_dtypes(filepath, sample_rows=1000):
+    rows = []
+    with open(filepath) as f:
+        col = f.readline().replace("\n", "").split(',')
+        for val in f:
+            if val.strip():
+                rows.append(val.replace("\n", "").split(','))
+            if len(rows) == sample_rows:
+                break
+    if not rows:
+        return {name: "object" for name in col}
+    return {name: _kind_of(values) for name, values in zip(col, zip(*rows))}
+
+
+def _build_column(values, kind):
+    if kind == "int64":
+        try:
+            return np.array(values, dtype=np.int64)
+        except ValueError:
+            # a row past the sample holds a decimal or an empty field
+            kind = "float64"
+    if kind == "float64":
+        try:
+            return np.array(values, dtype=np.float64)
+        except ValueError:
+            try:
+                return pd.to_numeric(np.array(values, dtype=object)).astype(np.float64)
+            except ValueError:
+                kind = "category"
+    if kind == "category":
+        return pd.Categorical(values)
+    return np.array(values, dtype=object)
+
+
+def _typed_frame(rows, col, start=0, dtypes=None):
+    dtypes = dtypes or {}
+    fields = zip(*rows) if rows else [()] * len(col)
+    columns = {name: _build_column(values, dtypes.get(name))
+               for name, values in zip(col, fields)}
+    index = pd.RangeIndex(start, start + len(rows))
+    return pd.DataFrame(columns, columns=col, index=index)
+
+
+# Chunked loading: only `chunksize` raw rows are alive at a time, each batch
+# is turned into a typed DataFrame before the next one is read.
+
+def iter_csv_chunks(filepath, chunksize=100_000, dtypes=None, validator=None):
+    if chunksize < 1:
+        raise ValueError("chunksize must be a positive number of rows")
+    if dtypes is None:
+        dtypes = sniff_dtypes(filepath)
+    with open(filepath) as f:
+        col = f.readline().replace("\n", "").split(',')
+        rows = []
+        start = 0
+        for val in f:
+            val = val.replace("\n", "")
+            if not val:
+                continue
+            rows.append(val.split(','))
+            if len(rows) == chunksize:
+                yield _checked(_typed_frame(rows, col, start, dtypes), start, validator)
+                start += len(rows)
+                rows = []
+        if rows:
+            yield _checked(_typed_frame(rows, col, start, dtypes), start, validator)
+
+
+def _checked(chunk, start, validator):
+    if validator is not None:
+        validator.check(chunk, start)
+    return chunk
+
+
+def _concat_columns(parts):
+    if all(isinstance(part, pd.Categorical) for part in parts):
+        return pd.api.types.union_categoricals(parts)
+    return np.concatenate([np.asarray(part) for part in parts])
+
+
+def concat_chunks(chunks):
+    frames = list(chunks)
+    if not frames:
+        return pd.DataFrame()
+    columns = {name: _concat_columns([frame[name].array for frame in frames])
+               for name in frames[0].columns}
+    return pd.DataFrame(columns, columns=frames[0].columns)
+
+
+# Parallel loading: the file is cut into newline-aligned byte ranges that are
+# parsed in a process pool; the header is read once, in the parent process.
+
+def _byte_ranges(filepath, parts):
+    with open(filepath, "rb") as f:
+        f.readline()
+        begin = f.tell()
+        size = os.fstat(f.fileno()).st_size
+        step = max((size - begin) // parts, 1)
+        bounds = [begin]
+        for i in range(1, parts):
+            target = begin + i * step
+            if target <= bounds[-1]:
+                continue
+            f.seek(target - 1)
+            f.readline()
+            if f.tell() >= size:
+                break
+            bounds.append(f.tell())
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def _read_range(filepath, start, stop):
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        text = f.read(stop - start).decode()
+    if "\r" in text:
+        text = text.replace("\r\n", "\n")
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return [val.split(',') for val in lines if val]
+
+
+def _parse_range(filepath, start, stop, col, dtypes, validator=None):
+    rows = _read_range(filepath, start, stop)
+    fields = zip(*rows) if rows else [()] * len(col)
+    columns = [_build_column(values, dtypes.get(name)) for name, values in zip(col, fields)]
+    if validator is None:
+        return columns, None, None
+    # row numbers are relative to the range, the parent shifts them; the
+    # duplicate check needs every range, so only the key hashes come back
+    frame = pd.DataFrame(dict(zip(col, columns)), columns=col)
+    part = Validator({**validator.schema, "unique": None}, validator.max_examples)
+    return columns, part.check(frame, 0), validator.key_hashes(frame)
+
+
+def _load_csv_parallel(filepath, dtypes, workers, validator=None):
+    with open(filepath) as f:
+        col = f.readline().replace("\n", "").split(',')
+    ranges = _byte_ranges(filepath, workers * 4)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_parse_range, filepath, a, b, col, dtypes, validator)
+                   for a, b in ranges]
+        parts = [future.result() for future in futures]
+    if validator is not None:
+        offset = 0
+        for columns, part, keys in parts:
+            validator.merge(part, offset)
+            if keys is not None:
+                validator.check_keys(keys, offset)
+            offset += part.rows
+    if not parts:
+        return _typed_frame([], col, dtypes=dtypes)
+    columns = {name: _concat_columns([part[0][i] for part in parts])
+               for i, name in enumerate(col)}
+    return pd.DataFrame(columns, columns=col)
+
+
+# Memory-mapped loading: field boundaries are found with vectorised scans over
+# the mapped bytes and numeric fields are parsed by NumPy in C, so the hot loop
+# creates no Python string per row. The file is scanned in windows of
+# MMAP_BLOCK_LINES lines, which bounds the scratch arrays to one window. Repeated
+# loads are served by the page cache.
+
+MMAP_BLOCK_LINES = 1 << 16
+
+
+def _gather_fields(buf, starts, lengths):
+    total = int(lengths.sum())
+    before = np.cumsum(lengths) - lengths
+    src = np.arange(total) + np.repeat(starts - before, lengths)
+    return buf[src], before
+
+
+def _numeric_block(buf, starts, lengths, kind):
+    data, before = _gather_fields(buf, starts, lengths)
+    # one separator byte after every field, the parser skips runs of spaces
+    out = np.full(len(data) + len(lengths), ord(" "), dtype=np.uint8)
+    out[np.arange(len(data)) + np.repeat(np.arange(len(lengths)), lengths)] = data
+    dtype = np.int64 if kind == "int64" else np.float64
+    try:
+        values = np.fromstring(out.tobytes(), dtype=dtype, sep=" ")
+    except ValueError:
+        return None
+    return values if len(values) == len(lengths) else None
+
+
+def _bytes_block(buf, starts, lengths):
+    data, before = _gather_fields(buf, starts, lengths)
+    width = max(int(lengths.max()), 1)
+    table = np.zeros((len(lengths), width), dtype=np.uint8)
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    table[rows, np.arange(len(data)) - np.repeat(before, lengths)] = data
+    return table.view(f"S{width}").ravel()
+
+
+def _mapped_column(buf, starts, ends, kind):
+    parts = []
+    for lo in range(0, len(starts), MMAP_BLOCK_LINES):
+        s, e = starts[lo:lo + MMAP_BLOCK_LINES], ends[lo:lo + MMAP_BLOCK_LINES]
+        lengths = e - s
+        values = None
+        if kind in ("int64", "float64"):
+            values = _numeric_block(buf, s, lengths, kind)
+        if values is None:
+            raw = _bytes_block(buf, s, lengths)
+            if kind in ("category", "int64", "float64"):
+                uniques, codes = np.unique(raw, return_inverse=True)
+                categories = [u.decode() for u in uniques]
+                if kind == "category":
+                    values = pd.Categorical.from_codes(codes, categories)
+                else:
+                    values = _build_column([categories[c] for c in codes], kind)
+            else:
+                values = np.array([u.decode() for u in raw], dtype=object)
+        parts.append(values)
+    if not parts:
+        return _build_column([], kind)
+    return _concat_columns(parts)
+
+
+def _mapped_windows(buf, start):
+    # (lo, hi, newlines) for consecutive windows of at most MMAP_BLOCK_LINES
+    # lines, so the scans below never allocate more than one window's worth
+    width = 1 << 22
+    while start < len(buf):
+        stop = min(start + width, len(buf))
+        newlines = np.flatnonzero(buf[start:stop] == ord("\n"))
+        if len(newlines) > MMAP_BLOCK_LINES:
+            newlines = newlines[:MMAP_BLOCK_LINES]
+            stop = start + int(newlines[-1]) + 1
+        elif stop < len(buf):
+            if not len(newlines):
+                width *= 2
+                continue
+            stop = start + int(newlines[-1]) + 1
+        yield start, stop, newlines
+        start = stop
+
+
+def _parse_window(window, newlines, col, row0):
+    bounds = np.concatenate(([-1], newlines))
+    if window[-1] != ord("\n"):
+        bounds = np.append(bounds, len(window))
+    starts, ends = bounds[:-1] + 1, bounds[1:]
+    ends = ends - ((ends > starts) & (window[np.maximum(ends - 1, 0)] == ord("\r")))
+    keep = ends > starts
+    starts, ends = starts[keep], ends[keep]
+    commas = np.flatnonzero(window == ord(","))
+    per_line = np.searchsorted(commas, ends) - np.searchsorted(commas, starts)
+    bad = np.flatnonzero(per_line != len(col) - 1)
+    if len(bad):
+        raise ValueError(f"row {row0 + int(bad[0])} has {int(per_line[bad[0]]) + 1} fields, "
+                         f"expected {len(col)}")
+    return starts, ends, commas.reshape(len(starts), len(col) - 1)
+
+
+def _parse_mapped(buf, dtypes, validator=None):
+    header_end = len(buf)
+    for lo in range(0, len(buf), 1 << 16):
+        hits = np.flatnonzero(buf[lo:lo + (1 << 16)] == ord("\n"))
+        if len(hits):
+            header_end = lo + int(hits[0])
+            break
+    col = bytes(buf[:header_end]).decode().rstrip("\r").split(',')
+    parts = {name: [] for name in col}
+    rows = 0
+    for lo, hi, newlines in _mapped_windows(buf, header_end + 1):
+        window = buf[lo:hi]
+        starts, ends, commas = _parse_window(window, newlines, col, rows)
+        for k, name in enumerate(col):
+            field_starts = starts if k == 0 else commas[:, k - 1] + 1
+            field_ends = ends if k == len(col) - 1 else commas[:, k]
+            parts[name].append(_mapped_column(window, field_starts, field_ends, dtypes.get(name)))
+        if validator is not None:
+            validator.check(pd.DataFrame({name: parts[name][-1] for name in col}, columns=col),
+                            rows)
+        rows += len(starts)
+    columns = {name: _concat_columns(parts[name]) if parts[name]
+               else _build_column([], dtypes.get(name)) for name in col}
+    return pd.DataFrame(columns, columns=col)
+
+
+def _load_csv_mmap(filepath, dtypes, validator=None):
+    with open(filepath, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return pd.DataFrame()
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return _parse_mapped(np.frombuffer(mm, dtype=np.uint8), dtypes, validator)
+    finally:
+        try:
+            mm.close()
+        except BufferError:
+            # a traceback still references the buffer, the map goes with it
+            pass
+
+
+# Columnar cache: a parsed frame is kept next to its source as one .npy file
+# per column plus a meta.json holding the source size, mtime and sha256. Later
+# loads read the binary columns and only re-parse when the source changed.
+
+def _file_stamp(filepath):
+    st = os.stat(filepath)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _file_hash(filepath):
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_json(path, obj):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
+
+
+def _save_columns(df, cache_dir, source):
+    meta_path = os.path.join(cache_dir, "meta.json")
+    os.makedirs(cache_dir, exist_ok=True)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    columns = []
+    for i, name in enumerate(df.columns):
+        column = df[name]
+        entry = {"name": name, "dtype": str(column.dtype), "file": f"{i}.npy"}
+        if isinstance(column.dtype, pd.CategoricalDtype) or column.dtype.kind not in "biufcmM":
+            # strings and categoricals are stored as codes plus a dictionary
+            codes, uniques = pd.factorize(column, sort=True)
+            entry["categories"] = list(uniques.astype(object))
+            np.save(os.path.join(cache_dir, entry["file"]), codes)
+        else:
+            np.save(os.path.join(cache_dir, entry["file"]), column.to_numpy())
+        columns.append(entry)
+    _write_json(meta_path, {"source": source, "columns": columns})
+
+
+def _load_columns(cache_dir, meta):
+    columns = {}
+    for entry in meta["columns"]:
+        values = np.load(os.path.join(cache_dir, entry["file"]))
+        if "categories" in entry:
+            if entry["dtype"] == "category":
+                values = pd.Categorical.from_codes(values, entry["categories"])
+            else:
+                uniques = np.array(entry["categories"] + [np.nan], dtype=object)
+                values = pd.array(uniques[values], dtype=entry["dtype"])
+        columns[entry["name"]] = values
+    return pd.DataFrame(columns, columns=[entry["name"] for entry in meta["columns"]])
+
+
+def cached_load(filepath, loader=None, cache_dir=None, verify_hash=False):
+    loader = loader or load_csv
+    cache_dir = cache_dir or f"{filepath}.cache"
+    meta_path = os.path.join(cache_dir, "meta.json")
+    stamp = _file_stamp(filepath)
+    digest = None
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        cached = meta["source"]
+        fresh = all(cached[key] == stamp[key] for key in stamp)
+        if verify_hash or not fresh:
+            # a touched but unchanged file keeps its cache
+            digest = _file_hash(filepath)
+            fresh = digest == cached["sha256"]
+            if fresh and cached["mtime_ns"] != stamp["mtime_ns"]:
+                _write_json(meta_path, {**meta, "source": {**stamp, "sha256": digest}})
+        if fresh:
+            return _load_columns(cache_dir, meta)
+    df = loader(filepath)
+    _save_columns(df, cache_dir, {**stamp, "sha256": digest or _file_hash(filepath)})
     return df
 
 
+# Streaming quantiles: a KLL-style compactor sketch. Level h holds items of
+# weight 2**h; once a level outgrows k items it is sorted and every other item,
+# from a random offset, is promoted to the next level. A compaction at level h
+# shifts any rank by at most 2**h with zero mean, which is where the
+# rank_error() bound comes from. Sketches built on separate chunks or processes
+# merge into one.
+
+class QuantileSketch:
+
+    def __init__(self, k=200, seed=None):
+        if k < 2:
+            raise ValueError("k must be at least 2")
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._weight_sq = 0.0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.n += other.n
+        self._weight_sq += other._weight_sq
+        self._compress()
+        return self
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.k:
+                items = np.sort(items)
+                even = len(items) - len(items) % 2
+                offset = self._rng.integers(2)
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], items[offset:even:2]])
+                self.levels[h] = items[even:]
+                self._weight_sq += 4.0 ** h
+            h += 1
+
+    def quantile(self, q):
+        if not self.n:
+            return np.full(np.shape(q), np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h)
+                                  for h, level in enumerate(self.levels)])
+        order = np.argsort(items)
+        items, weights = items[order], weights[order]
+        centres = np.cumsum(weights) - weights / 2
+        return np.interp(np.asarray(q) * self.n, centres, items)
+
+    def rank_error(self, delta=0.01):
+        # Hoeffding bound on the normalised rank error, holds with prob. 1 - delta
+        if not self.n:
+            return 0.0
+        return float(np.sqrt(2 * self._weight_sq * np.log(2 / delta)) / self.n)
+
+
+def _sketch_range(filepath, start, stop, col, dtypes, names, k, seed):
+    columns = dict(zip(col, _parse_range(filepath, start, stop, col, dtypes)))
+    return {name: QuantileSketch(k, seed).update(columns[name]) for name in names}
+
+
+def sketch_csv(filepath, columns=None, k=200, workers=None, seed=None):
+    dtypes = sniff_dtypes(filepath)
+    with open(filepath) as f:
+        col = f.readline().replace("\n", "").split(',')
+    names = columns or [name for name in col if dtypes[name] in ("int64", "float64")]
+    ranges = _byte_ranges(filepath, max(workers or 1, 1) * 4)
+    seeds = np.random.SeedSequence(seed).spawn(len(ranges))
+    jobs = [(filepath, a, b, col, dtypes, names, k, sq) for (a, b), sq in zip(ranges, seeds)]
+    if workers is not None and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = [future.result() for future in [pool.submit(_sketch_range, *job) for job in jobs]]
+    else:
+        parts = [_sketch_range(*job) for job in jobs]
+    sketches = {name: QuantileSketch(k, seed) for name in names}
+    for part in parts:
+        for name, sketch in part.items():
+            sketches[name].merge(sketch)
+    return sketches
+
+
+# Single-pass profile: the describe() statistics, null counts and first/last
+# rows are accumulated chunk by chunk, so the source never has to fit in memory.
+# Exact quantiles keep the numeric values; approximate ones feed a
+# QuantileSketch per column instead.
+
+def _iter_frames(source, chunksize):
+    if isinstance(source, pd.DataFrame):
+        yield source
+    elif isinstance(source, (str, os.PathLike)):
+        yield from load_csv(source, chunksize=chunksize)
+    else:
+        yield from source
+
+
+def profile(source, n=10, exact_quantiles=True, chunksize=100_000,
+            sketch_k=200, seed=None):
+    head, tail = [], deque()
+    head_rows = tail_rows = rows = 0
+    nulls = None
+    moments = {}
+    values = {}
+    for chunk in _iter_frames(source, chunksize):
+        rows += len(chunk)
+        if head_rows < n:
+            head.append(chunk.iloc[:n - head_rows])
+            head_rows += len(head[-1])
+        tail.append(chunk.iloc[-n:] if n else chunk.iloc[:0])
+        tail_rows += len(tail[-1])
+        while tail_rows - len(tail[0]) >= n and len(tail) > 1:
+            tail_rows -= len(tail.popleft())
+        chunk_nulls = chunk.isnull().sum()
+        nulls = chunk_nulls if nulls is None else nulls + chunk_nulls
+        for name in chunk.select_dtypes("number").columns:
+            arr = chunk[name].to_numpy(dtype=np.float64, na_value=np.nan)
+            arr = arr[~np.isnan(arr)]
+            count, mean, m2, lo, hi = moments.get(name, (0, 0.0, 0.0, np.inf, -np.inf))
+            if len(arr):
+                # Chan et al. pairwise merge of mean and sum of squared deviations
+                total = count + len(arr)
+                delta = arr.mean() - mean
+                m2 += ((arr - arr.mean()) ** 2).sum() + delta ** 2 * count * len(arr) / total
+                mean += delta * len(arr) / total
+                count, lo, hi = total, min(lo, arr.min()), max(hi, arr.max())
+            moments[name] = (count, mean, m2, lo, hi)
+            if exact_quantiles:
+                values.setdefault(name, []).append(arr)
+            else:
+                values.setdefault(name, QuantileSketch(sketch_k, seed)).update(arr)
+    describe = {}
+    for name, (count, mean, m2, lo, hi) in moments.items():
+        if not count:
+            quartiles = [np.nan] * 3
+        elif exact_quantiles:
+            quartiles = np.quantile(np.concatenate(values[name]), [0.25, 0.5, 0.75])
+        else:
+            quartiles = values[name].quantile([0.25, 0.5, 0.75])
+        describe[name] = [count, mean if count else np.nan,
+                          np.sqrt(m2 / (count - 1)) if count > 1 else np.nan,
+                          lo if count else np.nan, *quartiles, hi if count else np.nan]
+    last = pd.concat(tail) if tail else None
+    return {
+        "rows": rows,
+        "describe": pd.DataFrame(describe, index=["count", "mean", "std", "min",
+                                                  "25%", "50%", "75%", "max"]),
+        "nulls": nulls,
+        "quantile_error": {} if exact_quantiles else
+                          {name: sketch.rank_error() for name, sketch in values.items()},
+        "head": pd.concat(head) if head else None,
+        "tail": last.iloc[len(last) - n:] if last is not None else None,
+    }
+
+
+# Fast export: each column is formatted once as a whole (NumPy's shortest
+# round-trip text for floats, categories formatted once and indexed by code),
+# rows are joined per block and written through a large buffer, optionally
+# compressed. zstd uses the stdlib module (3.14+) or the zstandard package and
+# falls back to gzip when neither is installed.
+
+EXPORT_BLOCK_ROWS = 100_000
+
+
+def _quote(values):
+    values = np.asarray(values, dtype=object)
+    text = values.astype(str)
+    special = (np.char.find(text, ",") >= 0) | (np.char.find(text, '"') >= 0) \
+        | (np.char.find(text, "\n") >= 0)
+    if special.any():
+        text = text.astype(object)
+        text[special] = ['"' + v.replace('"', '""') + '"' for v in text[special]]
+    return text
+
+
+def _format_column(column, float_format=None):
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        labels = np.append(_quote(column.cat.categories), "")
+        return labels[column.cat.codes.to_numpy()].tolist()
+    values = column.to_numpy()
+    if values.dtype.kind == "f":
+        text = np.char.mod(float_format, values) if float_format else values.astype(str)
+        text[np.isnan(values)] = ""
+        return text.tolist()
+    if values.dtype.kind in "biu":
+        return values.astype(str).tolist()
+    text = _quote(np.where(pd.isna(values), "", values))
+    return text.tolist()
+
+
+def _open_output(path, compression=None, level=None):
+    if compression is None:
+        return open(path, "wb", buffering=1 << 20)
+    if compression == "zstd":
+        try:
+            from compression import zstd
+            return zstd.open(path, "wb", level=level)
+        except ImportError:
+            pass
+        try:
+            import zstandard
+            raw = open(path, "wb", buffering=1 << 20)
+            return zstandard.ZstdCompressor(level=level or 3).stream_writer(raw, closefd=True)
+        except ImportError:
+            warnings.warn("zstd is not available, writing gzip instead")
+            compression = "gzip"
+    if compression == "gzip":
+        return gzip.open(path, "wb", compresslevel=6 if level is None else level)
+    if compression == "bz2":
+        return bz2.open(path, "wb", compresslevel=9 if level is None else level)
+    if compression == "xz":
+        return lzma.open(path, "wb", preset=level)
+    raise ValueError(f"unknown compression {compression!r}")
+
+
+def _format_block(df, start, stop, index, float_format):
+    block = df.iloc[start:stop]
+    fields = [_format_column(block[name], float_format) for name in block.columns]
+    if index:
+        fields.insert(0, _quote(block.index.to_numpy()).tolist())
+    return ("\n".join(map(",".join, zip(*fields))) + "\n").encode()
+
+
+def export_csv(df, path, index=False, compression=None, level=None,
+               float_format=None, block_rows=None):
+    block_rows = block_rows or EXPORT_BLOCK_ROWS
+    header = list(_quote(df.columns))
+    if index:
+        header.insert(0, "")
+    with _open_output(path, compression, level) as f:
+        f.write((",".join(header) + "\n").encode())
+        for start in range(0, len(df), block_rows):
+            f.write(_format_block(df, start, start + block_rows, index, float_format))
+
+
+# Incremental export: a manifest next to the CSV records the file order of the
+# row keys (64-bit hashes in <path>.keys.npy) and a checksum, offset and length
+# for every block of rows. With slack > 0 every block is followed by `slack`
+# bytes of blank lines (skipped by pandas, not by csv.reader), so a revised value
+# that changes the length of its text still fits; by default there is none and
+# the file is byte for byte what export_csv writes. Later exports keep existing
+# rows where they are, append rows with new keys at the end, and only format and
+# write the blocks whose checksum changed: in place when the block still fits
+# its space, otherwise from that block to the end of the file.
+
+def _read_manifest(path, header, block_rows):
+    manifest_path = f"{path}.manifest.json"
+    if not (os.path.exists(path) and os.path.exists(manifest_path)):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if (manifest["header"] != header or manifest["block_rows"] != block_rows
+            or manifest["size"] != os.path.getsize(path)
+            or any("space" not in block for block in manifest["blocks"])):
+        return None
+    return manifest
+
+
+def export_csv_incremental(df, path, key=("Country or Area", "Year"),
+                           block_rows=10_000, float_format=None, slack=0):
+    key_hash = pd.util.hash_pandas_object(df[list(key)], index=False).to_numpy()
+    if pd.Index(key_hash).has_duplicates:
+        raise ValueError(f"duplicate {tuple(key)} keys, rows cannot be matched to the file")
+    row_hash = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    header = ",".join(_quote(df.columns)) + "\n"
+    manifest = _read_manifest(path, header, block_rows)
+    if manifest is None:
+        order = np.arange(len(df))
+        old_blocks = []
+    else:
+        old_keys = np.load(f"{path}.keys.npy")
+        kept = pd.Index(key_hash).get_indexer(old_keys)
+        order = np.concatenate([kept[kept >= 0], np.flatnonzero(~np.isin(key_hash, old_keys))])
+        old_blocks = manifest["blocks"]
+    blocks = []
+    written = rewritten = 0
+    shifted = False
+    with open(path, "r+b" if manifest else "wb") as f:
+        offset = f.write(header.encode()) if manifest is None else len(header.encode())
+        for b, start in enumerate(range(0, len(order), block_rows)):
+            rows = order[start:start + block_rows]
+            checksum = hashlib.sha1(row_hash[rows].tobytes()).hexdigest()
+            old = old_blocks[b] if b < len(old_blocks) else None
+            if not shifted and old is not None and old["checksum"] == checksum:
+                length, space = old["length"], old["space"]
+            else:
+                data = _format_block(df.iloc[rows], 0, len(rows), False, float_format)
+                length = len(data)
+                if not shifted and old is not None and length <= old["space"]:
+                    space = old["space"]
+                else:
+                    shifted = old is not None or shifted
+                    space = length + slack
+                data += b"\n" * (space - length)
+                f.seek(offset)
+                f.write(data)
+                written += len(data)
+                rewritten += 1
+            blocks.append({"checksum": checksum, "offset": offset, "length": length,
+                           "space": space})
+            offset += space
+        f.truncate(offset)
+    np.save(f"{path}.keys.npy", key_hash[order])
+    _write_json(f"{path}.manifest.json", {"header": header, "block_rows": block_rows,
+                                          "size": offset, "blocks": blocks})
+    return {"rows": len(order), "blocks_written": rewritten, "bytes_written": written}
+
+
+def make_greenhouse_frame(rows, seed=None, start=0):
+    # country-major, years descending from 2017, like the UN export
+    rng = np.random.default_rng(seed)
+    i = np.arange(start, start + rows)
+    first = start // 28
+    countries = [f"Country {k:07d}" for k in range(first, -(-(start + rows) // 28))]
+    return pd.DataFrame({
+        "Country or Area": pd.Categorical.from_codes(i // 28 - first, countries),
+        "Year": 2017 - i % 28,
+        "Value": rng.lognormal(11, 2, rows),
+    }, index=pd.RangeIndex(start, start + rows))
+
+
+def benchmark_export(rows=10_000_000, workdir=".", seed=0):
+    df = make_greenhouse_frame(rows, seed)
+    runs = {
+        "to_csv": ("bench_to_csv.csv", lambda path: df.to_csv(path)),
+        "export_csv": ("bench_export.csv", lambda path: export_csv(df, path)),
+        "export_csv_gzip": ("bench_export.csv.gz",
+                            lambda path: export_csv(df, path, compression="gzip", level=1)),
+    }
+    results = {}
+    for name, (filename, write) in runs.items():
+        path = os.path.join(workdir, filename)
+        t0 = time.perf_counter()
+        write(path)
+        results[name] = {"seconds": time.perf_counter() - t0, "bytes": os.path.getsize(path)}
+        os.remove(path)
+    return results
+
+
+# Loader benchmarks: synthetic greenhouse-shaped CSVs are generated block by
+# block, and every loader runs in a freshly forked process so that its peak RSS
+# (VmHWM, reset through /proc/self/clear_refs where allowed) is its own.
+# Time to first row is the time to the first chunk for streaming loaders and
+# the full load time otherwise. Worker processes of the parallel loader are
+# not included in its peak RSS.
+
+BENCH_SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+BENCH_LOADERS = {
+    "load_csv": lambda path: load_csv(path),
+    "load_csv_chunked": lambda path: load_csv(path, chunksize=100_000),
+    "load_csv_mmap": lambda path: load_csv(path, engine="mmap"),
+    "load_csv_parallel": lambda path: load_csv(path, workers=os.cpu_count()),
+    "pd.read_csv": lambda path: pd.read_csv(path),
+}
+
+
+def write_synthetic_greenhouse(path, rows, seed=None, block_rows=1_000_000):
+    rng = np.random.default_rng(seed)
+    with open(path, "wb", buffering=1 << 20) as f:
+        f.write(b"Country or Area,Year,Value\n")
+        for start in range(0, rows, block_rows):
+            block = make_greenhouse_frame(min(block_rows, rows - start), rng, start)
+            f.write(_format_block(block, 0, len(block), False, None))
+
+
+def _peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _bench_one(name, path):
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+    base = _peak_rss_mb()
+    t0 = time.perf_counter()
+    result = BENCH_LOADERS[name](path)
+    if isinstance(result, pd.DataFrame):
+        first = time.perf_counter()
+        rows = len(result)
+    else:
+        rows = len(next(result, ()))
+        first = time.perf_counter()
+        rows += sum(len(chunk) for chunk in result)
+    seconds = time.perf_counter() - t0
+    return {"loader": name, "rows": rows, "seconds": seconds,
+            "rows_per_sec": rows / seconds if seconds else None,
+            "time_to_first_row": first - t0,
+            "peak_rss_mb": _peak_rss_mb(), "base_rss_mb": base}
+
+
+def _bench_child(conn, name, path):
+    try:
+        conn.send(_bench_one(name, path))
+    except Exception as exc:
+        conn.send({"loader": name, "error": repr(exc)})
+    finally:
+        conn.close()
+
+
+def benchmark_loaders(sizes=BENCH_SIZES, loaders=None, workdir=".",
+                      results_path="bench_results.json", seed=0, keep_files=False):
+    ctx = multiprocessing.get_context("fork")
+    report = {
+        "machine": {"cpu_count": os.cpu_count(), "python": platform.python_version(),
+                    "numpy": np.__version__, "pandas": pd.__version__},
+        "results": [],
+    }
+    for rows in sizes:
+        path = os.path.join(workdir, f"greenhouse_{rows}.csv")
+        write_synthetic_greenhouse(path, rows, seed)
+        for name in loaders or BENCH_LOADERS:
+            receiver, sender = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_bench_child, args=(sender, name, path))
+            proc.start()
+            sender.close()
+            try:
+                record = receiver.recv()
+            except EOFError:
+                # killed before reporting, most likely by the OOM killer
+                record = {"loader": name, "error": "no result"}
+            proc.join()
+            record.update(size=rows, file_bytes=os.path.getsize(path),
+                          exitcode=proc.exitcode)
+            report["results"].append(record)
+            _write_json(results_path, report)
+        if not keep_files:
+            os.remove(path)
+    return report
+
+
+# Country/year index: the greenhouse frame is grouped by country, so every
+# country is one contiguous run of rows. The index keeps (start, stop) for
+# each run and, per run, the first year and a constant step when the years
+# are evenly spaced (O(1) year lookups) or falls back to a binary search over
+# the run's years. Slices are positional, so no boolean scan or copy is made.
+
+class CountryYearIndex:
+
+    def __init__(self, df, country="Country or Area", year="Year"):
+        codes, uniques = pd.factorize(df[country])
+        change = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+        starts = np.concatenate(([0], change)) if len(df) else np.empty(0, dtype=np.int64)
+        stops = np.concatenate((change, [len(df)])) if len(df) else starts
+        if len(np.unique(codes[starts])) != len(starts):
+            raise ValueError(f"rows of a {country!r} value are not contiguous, "
+                             f"sort the frame by {country!r} first")
+        self.df = df
+        self.years = df[year].to_numpy()
+        self.ranges = {}
+        self._steps = {}
+        for code, start, stop in zip(codes[starts], starts.tolist(), stops.tolist()):
+            name = uniques[code]
+            run = self.years[start:stop]
+            steps = np.diff(run)
+            if (steps > 0).all() or (steps < 0).all():
+                step = int(steps[0]) if len(steps) and (steps == steps[0]).all() else None
+            else:
+                raise ValueError(f"years of {name!r} are not strictly monotonic")
+            self.ranges[name] = (start, stop)
+            self._steps[name] = (run[0], step) if len(run) > 1 else (run[0], 1)
+        self._columns = {}
+
+    def __contains__(self, country):
+        return country in self.ranges
+
+    def slice(self, country):
+        start, stop = self.ranges[country]
+        return self.df.iloc[start:stop]
+
+    def column(self, country, name="Value"):
+        # NumPy view of one column over the country's rows
+        if name not in self._columns:
+            self._columns[name] = self.df[name].to_numpy()
+        start, stop = self.ranges[country]
+        return self._columns[name][start:stop]
+
+    def locate(self, country, year):
+        start, stop = self.ranges[country]
+        first, step = self._steps[country]
+        if step is not None:
+            offset, rest = divmod(year - first, step)
+            if rest == 0 and 0 <= offset < stop - start:
+                return start + int(offset)
+        else:
+            run = self.years[start:stop]
+            descending = run[0] > run[-1]
+            offset = np.searchsorted(-run if descending else run, -year if descending else year)
+            if offset < len(run) and run[offset] == year:
+                return start + int(offset)
+        raise KeyError((country, year))
+
+    def value(self, country, year, name="Value"):
+        if name not in self._columns:
+            self._columns[name] = self.df[name].to_numpy()
+        return self._columns[name][self.locate(country, year)]
+
+
+# Dense country x year matrix: long (country, year, value) rows are scattered
+# into a 2D float array with NaN for missing years, so cross-country maths is
+# plain array arithmetic, e.g. np.diff(matrix, axis=1) for year-over-year
+# deltas or np.argsort(-matrix[:, -1]) to rank countries by the latest year.
+
+def to_country_year_matrix(df, years=None, country="Country or Area", year="Year",
+                           value="Value"):
+    codes, countries = pd.factorize(df[country], sort=True)
+    row_years = df[year].to_numpy()
+    if years is None:
+        years = np.arange(row_years.min(), row_years.max() + 1) if len(df) else np.empty(0, int)
+    years = np.sort(np.asarray(years))
+    cols = np.searchsorted(years, row_years)
+    # rows without a country (factorize code -1) are dropped like years outside
+    # `years`, rather than landing in the last country's row
+    inside = (cols < len(years)) & (codes >= 0)
+    inside[inside] = years[cols[inside]] == row_years[inside]
+    codes, cols = codes[inside], cols[inside]
+    cells = codes * len(years) + cols
+    if len(np.unique(cells)) != len(cells):
+        raise ValueError(f"duplicate ({country!r}, {year!r}) rows")
+    matrix = np.full((len(countries), len(years)), np.nan)
+    matrix[codes, cols] = df[value].to_numpy(dtype=np.float64)[inside]
+    country_map = {name: i for i, name in enumerate(countries)}
+    year_map = {int(y): j for j, y in enumerate(years)}
+    return matrix, country_map, year_map
+
+
+def from_country_year_matrix(matrix, countries, years, descending_years=True,
+                             country="Country or Area", year="Year", value="Value"):
+    countries = list(countries)
+    years = np.asarray(list(years))
+    if descending_years:
+        matrix, years = matrix[:, ::-1], years[::-1]
+    rows, cols = np.nonzero(~np.isnan(matrix))
+    return pd.DataFrame({
+        country: pd.Categorical.from_codes(rows, countries),
+        year: years[cols],
+        value: matrix[rows, cols],
+    })
+
+
+# Out-of-core group-by: every chunk is reduced to partial aggregates per group
+# (count, sum, min, max and m2, the sum of squared deviations) that are merged
+# with Chan's formula. When more than max_groups groups are held, the partials
+# are hash-partitioned into spill files; each partition then holds complete
+# groups and is merged on its own at the end.
+
+GROUPBY_AGGS = ("sum", "count", "min", "max", "mean", "var")
+
+
+def _partials(chunk, by, columns):
+    grouped = chunk.groupby(by, observed=True, sort=False)[columns]
+    count = grouped.count()
+    return {
+        "count": count,
+        "sum": grouped.sum(),
+        "min": grouped.min(),
+        "max": grouped.max(),
+        "m2": (grouped.var(ddof=0) * count).fillna(0.0),
+    }
+
+
+def _merge_partials(partials):
+    parts = {stat: pd.concat([partial[stat] for partial in partials]) for stat in partials[0]}
+    levels = list(range(parts["count"].index.nlevels))
+
+    def reduce(frame, how):
+        return frame.groupby(level=levels, sort=False).agg(how)
+
+    count = reduce(parts["count"], "sum")
+    total = reduce(parts["sum"], "sum")
+    mean = (total / count).reindex(parts["count"].index)
+    spread = parts["count"] * (parts["sum"] / parts["count"] - mean) ** 2
+    return {
+        "count": count,
+        "sum": total,
+        "min": reduce(parts["min"], "min"),
+        "max": reduce(parts["max"], "max"),
+        "m2": reduce(parts["m2"] + spread.fillna(0.0), "sum"),
+    }
+
+
+def _finalize(partial, columns, aggs):
+    count = partial["count"]
+    stats = {
+        "sum": partial["sum"],
+        "count": count,
+        "min": partial["min"],
+        "max": partial["max"],
+        "mean": partial["sum"] / count,
+        "var": (partial["m2"] / (count - 1)).where(count > 1),
+    }
+    result = pd.concat({(name, agg): stats[agg][name] for name in columns for agg in aggs},
+                       axis=1)
+    return result.sort_index()
+
+
+def _spill(partial, files, partitions):
+    index = partial["count"].index
+    slot = pd.util.hash_pandas_object(index, index=False).to_numpy() % partitions
+    for p in np.unique(slot):
+        with open(files[p], "ab") as f:
+            pickle.dump({stat: frame[slot == p] for stat, frame in partial.items()}, f)
+
+
+def _read_spill(path):
+    frames = []
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    frames.append(pickle.load(f))
+                except EOFError:
+                    break
+    return frames
+
+
+def groupby_agg(source, by="Country or Area", columns=None, aggs=GROUPBY_AGGS,
+                chunksize=100_000, max_groups=1_000_000, partitions=16, spill_dir=None):
+    by = [by] if isinstance(by, str) else list(by)
+    acc = None
+    spilled = False
+    with tempfile.TemporaryDirectory(dir=spill_dir) as tmp:
+        files = [os.path.join(tmp, f"part{p}.pkl") for p in range(partitions)]
+        for chunk in _iter_frames(source, chunksize):
+            if columns is None:
+                columns = [name for name in chunk.select_dtypes("number").columns
+                           if name not in by]
+            part = _partials(chunk, by, columns)
+            acc = part if acc is None else _merge_partials([acc, part])
+            if len(acc["count"]) > max_groups:
+                _spill(acc, files, partitions)
+                acc, spilled = None, True
+        if not spilled:
+            if acc is None:
+                return pd.DataFrame()
+            return _finalize(acc, columns, aggs)
+        if acc is not None:
+            _spill(acc, files, partitions)
+        results = [_finalize(_merge_partials(frames), columns, aggs)
+                   for frames in map(_read_spill, files) if frames]
+    return pd.concat(results).sort_index()
+
+
+# Row offset index: one streaming pass writes the byte offset of every data row
+# (plus the end of the data) block by block into <file>.rows.npy, stamped with
+# the source size and mtime in <file>.rows.json. Row reads then seek straight
+# to row N, and the index is memory-mapped so tail_csv() only touches a few
+# pages of it.
+
+def build_row_index(filepath, block_size=1 << 24):
+    index_path = f"{filepath}.rows.npy"
+    header = {"descr": np.lib.format.dtype_to_descr(np.dtype(np.int64)),
+              "fortran_order": False, "shape": (0,)}
+    rows = 0
+    with open(filepath, "rb") as f, open(f"{index_path}.tmp", "wb") as out:
+        # the .npy header leaves room for any row count, so it is rewritten
+        # in place once the count is known
+        np.lib.format.write_array_header_1_0(out, header)
+        data_start = out.tell()
+        f.readline()
+        pos = pending = f.tell()
+        for block in iter(lambda: f.read(block_size), b""):
+            newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord("\n"))
+            starts = np.concatenate(([pending], newlines + pos + 1)).astype(np.int64)
+            # blank lines (the slack of an incremental export) are not rows
+            kept = starts[:-1][np.diff(starts) > 1]
+            out.write(kept.tobytes())
+            rows += len(kept)
+            pending = int(starts[-1])
+            pos += len(block)
+        # a last row without a trailing newline, then the end of the data
+        tail = [pending, pos] if pending < pos else [pos]
+        out.write(np.array(tail, dtype=np.int64).tobytes())
+        rows += len(tail)
+        out.seek(0)
+        np.lib.format.write_array_header_1_0(out, {**header, "shape": (rows,)})
+        if out.tell() != data_start:
+            raise RuntimeError("row index header changed size")
+    os.replace(f"{index_path}.tmp", index_path)
+    _write_json(f"{filepath}.rows.json", _file_stamp(filepath))
+    return np.load(index_path, mmap_mode="r")
+
+
+def _row_index(filepath):
+    meta_path = f"{filepath}.rows.json"
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            if json.load(f) == _file_stamp(filepath):
+                return np.load(f"{filepath}.rows.npy", mmap_mode="r")
+    return build_row_index(filepath)
+
+
+def read_rows(filepath, start=None, stop=None, dtypes=None):
+    offsets = _row_index(filepath)
+    start, stop, _ = slice(start, stop).indices(len(offsets) - 1)
+    stop = max(start, stop)
+    with open(filepath) as f:
+        col = f.readline().replace("\n", "").split(',')
+    rows = _read_range(filepath, int(offsets[start]), int(offsets[stop])) if stop > start else []
+    return _typed_frame(rows, col, start, dtypes or sniff_dtypes(filepath))
+
+
+def iloc_csv(filepath, i, dtypes=None):
+    nrows = len(_row_index(filepath)) - 1
+    if not -nrows <= i < nrows:
+        raise IndexError(f"row {i} out of range for {nrows} rows")
+    i %= nrows
+    return read_rows(filepath, i, i + 1, dtypes).iloc[0]
+
+
+def tail_csv(filepath, n=10, dtypes=None):
+    nrows = len(_row_index(filepath)) - 1
+    return read_rows(filepath, max(nrows - n, 0), nrows, dtypes)
+
+
+# Load-time validation: a Validator is handed every typed chunk as soon as it
+# is parsed, while its arrays are still in cache, and counts rule violations
+# with a few vectorised comparisons. Duplicate keys are tracked as 64-bit
+# hashes in sorted runs that are merged as they grow, so each lookup is a
+# binary search. report() gives the count and the first row numbers per rule.
+# Parallel loads check each byte range in its worker and merge() the findings
+# in file order; only the key hashes come back for the duplicate check.
+
+GREENHOUSE_COUNTRIES = frozenset([
+    "Australia", "Austria", "Belarus", "Belgium", "Bulgaria", "Canada", "Croatia",
+    "Cyprus", "Czechia", "Denmark", "Estonia", "European Union", "Finland", "France",
+    "Germany", "Greece", "Hungary", "Iceland", "Ireland", "Italy", "Japan", "Latvia",
+    "Liechtenstein", "Lithuania", "Luxembourg", "Malta", "Monaco", "Netherlands",
+    "New Zealand", "Norway", "Poland", "Portugal", "Romania", "Russian Federation",
+    "Slovakia", "Slovenia", "Spain", "Sweden", "Switzerland", "Turkey", "Ukraine",
+    "United Kingdom", "United States of America",
+])
+
+GREENHOUSE_SCHEMA = {
+    "columns": {
+        "Country or Area": {"not_null": True, "allowed": GREENHOUSE_COUNTRIES},
+        "Year": {"not_null": True, "min": 1990, "max": 2017},
+        "Value": {"finite": True, "min": 0},
+    },
+    "unique": ["Country or Area", "Year"],
+}
+
+
+class Validator:
+
+    def __init__(self, schema=None, max_examples=10):
+        self.schema = schema or GREENHOUSE_SCHEMA
+        self.max_examples = max_examples
+        self.rows = 0
+        self.violations = {}
+        self._seen = []
+
+    def _record(self, rule, mask, offset):
+        hits = np.flatnonzero(mask)
+        if not len(hits):
+            return
+        entry = self.violations.setdefault(rule, {"count": 0, "rows": []})
+        entry["count"] += len(hits)
+        room = self.max_examples - len(entry["rows"])
+        entry["rows"] += (hits[:max(room, 0)] + offset).tolist()
+
+    def _check_column(self, name, column, rules, offset):
+        if "allowed" in rules:
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                # one membership test per category instead of per row
+                known = np.append(column.cat.categories.isin(list(rules["allowed"])), True)
+                self._record(f"{name}: unknown value", ~known[column.cat.codes.to_numpy()], offset)
+            else:
+                self._record(f"{name}: unknown value",
+                             ~(column.isin(list(rules["allowed"])) | column.isna()).to_numpy(),
+                             offset)
+        if rules.get("not_null"):
+            self._record(f"{name}: null", column.isna().to_numpy(), offset)
+        if not ({"finite", "min", "max"} & rules.keys()):
+            return
+        values = pd.to_numeric(column, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        if rules.get("finite"):
+            self._record(f"{name}: not finite", ~np.isfinite(values), offset)
+        if "min" in rules:
+            self._record(f"{name}: below {rules['min']}", values < rules["min"], offset)
+        if "max" in rules:
+            self._record(f"{name}: above {rules['max']}", values > rules["max"], offset)
+
+    def key_hashes(self, chunk):
+        unique = self.schema.get("unique")
+        if not unique or not all(name in chunk.columns for name in unique):
+            return None
+        return pd.util.hash_pandas_object(chunk[unique], index=False).to_numpy()
+
+    def check_keys(self, hashes, offset):
+        if not len(hashes):
+            return self
+        duplicate = pd.Index(hashes).duplicated()
+        for run in self._seen:
+            pos = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+            duplicate |= run[pos] == hashes
+        self._record(f"{', '.join(self.schema['unique'])}: duplicate", duplicate, offset)
+        run = np.unique(hashes)
+        while self._seen and len(self._seen[-1]) <= len(run):
+            run = np.union1d(self._seen.pop(), run)
+        self._seen.append(run)
+        return self
+
+    def check(self, chunk, offset=None):
+        offset = self.rows if offset is None else offset
+        for name, rules in self.schema.get("columns", {}).items():
+            if name not in chunk.columns:
+                self.violations.setdefault(f"{name}: missing column", {"count": 1, "rows": []})
+                continue
+            self._check_column(name, chunk[name], rules, offset)
+        hashes = self.key_hashes(chunk)
+        if hashes is not None:
+            self.check_keys(hashes, offset)
+        self.rows = max(self.rows, offset + len(chunk))
+        return self
+
+    def merge(self, other, offset=0):
+        # folds in the findings of a validator that checked rows from `offset`
+        for rule, entry in other.violations.items():
+            if rule.endswith(": missing column"):
+                self.violations.setdefault(rule, dict(entry))
+                continue
+            mine = self.violations.setdefault(rule, {"count": 0, "rows": []})
+            mine["count"] += entry["count"]
+            room = max(self.max_examples - len(mine["rows"]), 0)
+            mine["rows"] += [row + offset for row in entry["rows"][:room]]
+        self.rows = max(self.rows, offset + other.rows)
+        return self
+
+    def report(self):
+        return {"rows": self.rows, "valid": not self.violations, "violations": self.violations}
+
+
+# Compact columnar format: string and categorical columns are dictionary
+# encoded, integer columns are stored per block as a base value plus zigzag
+# deltas bit-packed to the narrowest width, and float columns as raw
+# little-endian float64 so they can be memory-mapped. A JSON footer keeps the
+# layout and per-block min/max statistics that read_compact uses to skip
+# blocks. Only frames with a default RangeIndex are written.
+
+COMPACT_MAGIC = b"GHCOL001"
+
+
+def _smallest_int(n):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _pack_ints(values):
+    values = values.astype(np.int64)
+    deltas = np.diff(values)
+    zigzag = ((deltas << 1) ^ (deltas >> 63)).view(np.uint64)
+    bits = int(zigzag.max()).bit_length() if len(zigzag) else 0
+    if not bits:
+        return int(values[0]), 0, b""
+    shifts = np.arange(bits, dtype=np.uint64)
+    matrix = ((zigzag[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+    return int(values[0]), bits, np.packbits(matrix, bitorder="little").tobytes()
+
+
+def _unpack_ints(base, bits, packed, n):
+    if not bits:
+        return np.full(n, base, dtype=np.int64)
+    matrix = np.unpackbits(packed, count=(n - 1) * bits, bitorder="little")
+    matrix = matrix.reshape(n - 1, bits).astype(np.uint64)
+    zigzag = (matrix << np.arange(bits, dtype=np.uint64)).sum(axis=1, dtype=np.uint64)
+    deltas = (zigzag >> np.uint64(1)).view(np.int64) ^ -(zigzag & np.uint64(1)).view(np.int64)
+    return base + np.concatenate(([0], np.cumsum(deltas)))
+
+
+def _align(f):
+    f.write(b"\0" * (-f.tell() % 8))
+    return f.tell()
+
+
+def _write_compact_column(f, column, bounds):
+    entry = {"name": column.name, "dtype": str(column.dtype)}
+    if isinstance(column.dtype, pd.CategoricalDtype) or column.dtype.kind not in "biuf":
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes, uniques = column.cat.codes.to_numpy(), column.cat.categories
+            entry["ordered"] = bool(column.cat.ordered)
+        else:
+            codes, uniques = pd.factorize(column, sort=True)
+        dictionary = list(uniques.astype(object))
+        rank = np.append(np.argsort(np.argsort(np.array(dictionary, dtype=str))), -1)
+        codes = codes.astype(_smallest_int(len(dictionary)))
+        entry.update(encoding="dictionary", dictionary=dictionary,
+                     codes_dtype=codes.dtype.str, offset=_align(f), stats=[])
+        f.write(codes.tobytes())
+        by_rank = np.argsort(rank[:-1])
+        for start, stop in bounds:
+            ranks = rank[codes[start:stop]]
+            ranks = ranks[ranks >= 0]
+            entry["stats"].append([dictionary[by_rank[ranks.min()]], dictionary[by_rank[ranks.max()]]]
+                                  if len(ranks) else None)
+    elif column.dtype.kind in "biu":
+        values = column.to_numpy()
+        entry.update(encoding="delta", blocks=[], stats=[])
+        for start, stop in bounds:
+            block = values[start:stop]
+            base, bits, packed = _pack_ints(block)
+            entry["blocks"].append({"base": base, "bits": bits, "offset": f.tell()})
+            f.write(packed)
+            entry["stats"].append([int(block.min()), int(block.max())])
+    else:
+        values = column.to_numpy(dtype="<f8")
+        entry.update(encoding="plain", offset=_align(f), stats=[])
+        f.write(values.tobytes())
+        for start, stop in bounds:
+            block = values[start:stop]
+            present = block[~np.isnan(block)]
+            entry["stats"].append([float(present.min()), float(present.max())]
+                                  if len(present) else None)
+    return entry
+
+
+def write_compact(df, path, block_rows=65_536):
+    if not df.index.equals(pd.RangeIndex(len(df))):
+        raise ValueError("write_compact stores a default RangeIndex only, reset_index() first")
+    bounds = [(start, min(start + block_rows, len(df))) for start in range(0, len(df), block_rows)]
+    with open(path, "wb") as f:
+        f.write(COMPACT_MAGIC)
+        columns = [_write_compact_column(f, df[name], bounds) for name in df.columns]
+        footer = json.dumps({"rows": len(df), "blocks": bounds, "columns": columns}).encode()
+        f.write(footer)
+        f.write(len(footer).to_bytes(8, "little") + COMPACT_MAGIC)
+
+
+def _read_compact_footer(path):
+    with open(path, "rb") as f:
+        if f.read(len(COMPACT_MAGIC)) != COMPACT_MAGIC:
+            raise ValueError(f"{path} is not a compact columnar file")
+        f.seek(-8 - len(COMPACT_MAGIC), os.SEEK_END)
+        length = int.from_bytes(f.read(8), "little")
+        f.seek(-8 - len(COMPACT_MAGIC) - length, os.SEEK_END)
+        return json.loads(f.read(length))
+
+
+def _read_compact_column(path, entry, rows, selected, blocks):
+    if entry["encoding"] == "delta":
+        raw = np.memmap(path, dtype=np.uint8, mode="r")
+        parts = []
+        for b in selected:
+            start, stop = blocks[b]
+            info = entry["blocks"][b]
+            size = -(-(stop - start - 1) * info["bits"] // 8) if info["bits"] else 0
+            parts.append(_unpack_ints(info["base"], info["bits"],
+                                      raw[info["offset"]:info["offset"] + size], stop - start))
+        values = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+        return values.astype(entry["dtype"])
+    dtype = entry["codes_dtype"] if entry["encoding"] == "dictionary" else "<f8"
+    mapped = np.memmap(path, dtype=dtype, mode="r", offset=entry["offset"], shape=(rows,))
+    if len(selected) == len(blocks):
+        values = mapped
+    elif selected and selected[-1] - selected[0] == len(selected) - 1:
+        values = mapped[blocks[selected[0]][0]:blocks[selected[-1]][1]]
+    else:
+        values = np.concatenate([mapped[blocks[b][0]:blocks[b][1]] for b in selected]
+                                or [mapped[:0]])
+    if entry["encoding"] == "plain":
+        return values.astype(entry["dtype"], copy=False)
+    if entry["dtype"] == "category":
+        return pd.Categorical.from_codes(values, entry["dictionary"], ordered=entry["ordered"])
+    dictionary = np.array(entry["dictionary"] + [np.nan], dtype=object)
+    return pd.array(dictionary[values], dtype=entry["dtype"])
+
+
+def _in_range(column, lo, hi):
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # one comparison per dictionary entry; missing values (code -1) fall out
+        categories = column.cat.categories.astype(object)
+        inside = np.append((categories >= lo) & (categories <= hi), False)
+        return inside[column.cat.codes.to_numpy()]
+    return ((column >= lo) & (column <= hi)).fillna(False).to_numpy(dtype=bool)
+
+
+def read_compact(path, columns=None, where=None):
+    meta = _read_compact_footer(path)
+    entries = {entry["name"]: entry for entry in meta["columns"]}
+    blocks = meta["blocks"]
+    where = where or {}
+    selected = []
+    for b in range(len(blocks)):
+        stats = [entries[name]["stats"][b] for name in where]
+        if all(stat is not None and stat[0] <= hi and stat[1] >= lo
+               for stat, (lo, hi) in zip(stats, where.values())):
+            selected.append(b)
+    names = columns or list(entries)
+    data = {name: _read_compact_column(path, entries[name], meta["rows"], selected, blocks)
+            for name in dict.fromkeys([*names, *where])}
+    if len(selected) == len(blocks):
+        index = pd.RangeIndex(meta["rows"])
+    else:
+        index = np.concatenate([np.arange(*blocks[b]) for b in selected] or [np.empty(0, int)])
+    df = pd.DataFrame(data, index=index, copy=False)
+    if where:
+        keep = np.ones(len(df), dtype=bool)
+        for name, (lo, hi) in where.items():
+            keep &= _in_range(df[name], lo, hi)
+        if not keep.all():
+            df = df[keep]
+    return df[names]
+
+
+# Shared-memory frames: publish_frame() copies the columns of a loaded frame
+# once into multiprocessing.shared_memory blocks, next to a <name>_meta block
+# holding a reference count and the JSON layout. attach_frame() in any other
+# process rebuilds the DataFrame over read-only views of those blocks without
+# copying; string columns travel dictionary encoded and come back as
+# categoricals, datetimes as raw datetime64 values. A non-default index is
+# published like one more column. The count is updated under a file lock and
+# the last detach()
+# unlinks every block. Blocks are not handed to the resource tracker, so they
+# outlive the publishing process, and leak if every user dies without detaching.
+
+def _open_block(name, size=0):
+    create = size > 0
+    try:
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    except TypeError:
+        # Python < 3.13 has no track argument
+        block = shared_memory.SharedMemory(name=name, create=create, size=size)
+        resource_tracker.unregister(block._name, "shared_memory")
+        block.untracked = True
+        return block
+
+
+def _unlink_block(block):
+    if getattr(block, "untracked", False):
+        # unlink() unregisters the block again on these versions
+        resource_tracker.register(block._name, "shared_memory")
+    block.unlink()
+
+
+@contextlib.contextmanager
+def _shared_lock(name):
+    # an exclusive lock on <tmp>/<name>.lock; fcntl is imported here so the
+    # rest of the module still imports on Windows
+    path = os.path.join(tempfile.gettempdir(), f"{name}.lock")
+    with open(path, "a+b") as lock:
+        if os.name == "nt":
+            import msvcrt
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield path
+            finally:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield path
+
+
+def _shared_values(entry, block, rows):
+    # frombuffer keeps an export on the block, so close() cannot unmap it
+    # while a view is alive
+    values = np.frombuffer(block.buf, dtype=entry["dtype"], count=rows)
+    values.flags.writeable = False
+    if "categories" in entry:
+        return pd.Categorical.from_codes(values, entry["categories"])
+    if "tz" in entry:
+        # stored as UTC wall times; localizing makes a copy
+        return pd.DatetimeIndex(values).tz_localize("UTC").tz_convert(entry["tz"])
+    return values
+
+
+class SharedFrame:
+
+    def __init__(self, name, meta_block, layout):
+        self.name = name
+        self._meta = meta_block
+        entries = layout["columns"] + ([layout["index"]] if "index" in layout else [])
+        self._blocks = [_open_block(entry["block"]) for entry in entries]
+        columns = {entry["name"]: _shared_values(entry, block, layout["rows"])
+                   for entry, block in zip(layout["columns"], self._blocks)}
+        if "index" in layout:
+            index = pd.Index(_shared_values(layout["index"], self._blocks[-1], layout["rows"]),
+                             name=layout["index"]["name"], copy=False)
+        else:
+            index = pd.RangeIndex(*layout["range"])
+        self.frame = pd.DataFrame(columns, index=index,
+                                  columns=[c["name"] for c in layout["columns"]], copy=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.detach()
+
+    def _references(self, delta):
+        counter = np.ndarray((1,), dtype=np.int64, buffer=self._meta.buf)
+        counter[0] += delta
+        refs = int(counter[0])
+        del counter
+        return refs
+
+    def detach(self):
+        if self._meta is None:
+            return
+        self.frame = None
+        with _shared_lock(self.name) as lock_path:
+            last = self._references(-1) == 0
+            if last:
+                for block in [*self._blocks, self._meta]:
+                    _unlink_block(block)
+        if last:
+            os.remove(lock_path)
+        for block in [*self._blocks, self._meta]:
+            try:
+                block.close()
+            except BufferError:
+                # a caller still holds a view, the mapping goes with it
+                block._buf = block._mmap = None
+        self._meta = None
+
+
+def _publish_values(column, entry, created):
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        values = column.cat.codes.to_numpy()
+        entry["categories"] = list(column.cat.categories.astype(object))
+    elif isinstance(column.dtype, pd.DatetimeTZDtype):
+        values = pd.DatetimeIndex(column).tz_convert("UTC").tz_localize(None).to_numpy()
+        entry["tz"] = str(column.dtype.tz)
+    elif column.dtype.kind not in "biufmM":
+        values, uniques = pd.factorize(column, sort=True)
+        entry["categories"] = list(uniques.astype(object))
+    else:
+        values = column.to_numpy()
+    entry["dtype"] = values.dtype.str
+    block = _open_block(entry["block"], max(values.nbytes, 1))
+    created.append(block)
+    np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+    return entry
+
+
+def publish_frame(df, name=None):
+    if isinstance(df.index, pd.MultiIndex):
+        raise ValueError("publish_frame does not share a MultiIndex, reset_index() first")
+    name = name or f"gh{os.getpid()}_{uuid.uuid4().hex[:8]}"
+    layout = {"rows": len(df), "columns": []}
+    created = []
+    try:
+        for i, column_name in enumerate(df.columns):
+            layout["columns"].append(_publish_values(
+                df[column_name], {"name": column_name, "block": f"{name}_{i}"}, created))
+        if isinstance(df.index, pd.RangeIndex):
+            layout["range"] = [df.index.start, df.index.stop, df.index.step]
+        else:
+            layout["index"] = _publish_values(
+                df.index, {"name": df.index.name, "block": f"{name}_index"}, created)
+        payload = json.dumps(layout).encode()
+        meta = _open_block(f"{name}_meta", 16 + len(payload))
+        created.append(meta)
+    except BaseException:
+        # the blocks are untracked, nothing else would ever remove them
+        for block in created:
+            block.close()
+            _unlink_block(block)
+        raise
+    for block in created[:-1]:
+        block.close()
+    header = np.ndarray((2,), dtype=np.int64, buffer=meta.buf)
+    header[:] = [1, len(payload)]
+    del header
+    meta.buf[16:16 + len(payload)] = payload
+    return SharedFrame(name, meta, layout)
+
+
+def attach_frame(name):
+    meta = _open_block(f"{name}_meta")
+    with _shared_lock(name):
+        header = np.ndarray((2,), dtype=np.int64, buffer=meta.buf)
+        refs, length = int(header[0]), int(header[1])
+        if refs > 0:
+            header[0] += 1
+        del header
+        if refs <= 0:
+            meta.close()
+            raise FileNotFoundError(f"shared frame {name!r} has been released")
+        layout = json.loads(bytes(meta.buf[16:16 + length]))
+    return SharedFrame(name, meta, layout)
+
+
 """
 
 1 - Load the CSV file into a variable - greenhouse_data
@@ -29,86 +1679,90 @@ def load_csv(filepath):
 
 """
 
-# 1 - Load the CSV file into a variable - greenhouse_data
+if __name__ == "__main__":
+    # 1 - Load the CSV file into a variable - greenhouse_data
 
-greenhouse_data = pd.read_csv('./datasets/UNdata_Greenhouse_Gas.csv')
+    # the parsed columns are cached in ./datasets/UNdata_Greenhouse_Gas.csv.cache
+    # and reused until the CSV changes
 
-# 2 - Use the description function to understand how the data looks like
+    greenhouse_data = cached_load('./datasets/UNdata_Greenhouse_Gas.csv', loader=pd.read_csv)
 
-print(greenhouse_data.describe())
+    # 2 - Use the description function to understand how the data looks like
 
-"""
-              Year         Value
-count  1204.000000  1.204000e+03
-mean   2003.500000  5.280785e+05
-std       8.081104  1.283749e+06
-min    1990.000000  8.412655e+01
-25%    1996.750000  3.093901e+04
-50%    2003.500000  8.069707e+04
-75%    2010.250000  4.392478e+05
-max    2017.000000  7.369968e+06
-"""
+    print(greenhouse_data.describe())
 
-# 3 - Print its first 10 rows using head()
+    """
+                  Year         Value
+    count  1204.000000  1.204000e+03
+    mean   2003.500000  5.280785e+05
+    std       8.081104  1.283749e+06
+    min    1990.000000  8.412655e+01
+    25%    1996.750000  3.093901e+04
+    50%    2003.500000  8.069707e+04
+    75%    2010.250000  4.392478e+05
+    max    2017.000000  7.369968e+06
+    """
 
-print(greenhouse_data.head(10))
+    # 3 - Print its first 10 rows using head()
 
-"""
- Country or Area  Year          Value
-0       Australia  2017  554126.561371
-1       Australia  2016  546771.759767
-2       Australia  2015  535173.674335
-3       Australia  2014  524957.101167
-4       Australia  2013  530433.518839
-5       Australia  2012  540615.864772
-6       Australia  2011  538280.611349
-7       Australia  2010  537275.249361
-8       Australia  2009  540913.370344
-9       Australia  2008  537031.991695
-"""
+    print(greenhouse_data.head(10))
 
-# 4 - Print its last 10 rows using tail()
+    """
+     Country or Area  Year          Value
+    0       Australia  2017  554126.561371
+    1       Australia  2016  546771.759767
+    2       Australia  2015  535173.674335
+    3       Australia  2014  524957.101167
+    4       Australia  2013  530433.518839
+    5       Australia  2012  540615.864772
+    6       Australia  2011  538280.611349
+    7       Australia  2010  537275.249361
+    8       Australia  2009  540913.370344
+    9       Australia  2008  537031.991695
+    """
 
-print(greenhouse_data.tail(10))
+    # 4 - Print its last 10 rows using tail()
 
-"""
-               Country or Area  Year         Value
-1194  United States of America  1999  7.071461e+06
-1195  United States of America  1998  7.032526e+06
-1196  United States of America  1997  6.968462e+06
-1197  United States of America  1996  6.907699e+06
-1198  United States of America  1995  6.710067e+06
-1199  United States of America  1994  6.624836e+06
-1200  United States of America  1993  6.532070e+06
-1201  United States of America  1992  6.424934e+06
-1202  United States of America  1991  6.315615e+06
-1203  United States of America  1990  6.371001e+06
-"""
+    print(greenhouse_data.tail(10))
 
-# 5 - Check if there are any null values
+    """
+                   Country or Area  Year         Value
+    1194  United States of America  1999  7.071461e+06
+    1195  United States of America  1998  7.032526e+06
+    1196  United States of America  1997  6.968462e+06
+    1197  United States of America  1996  6.907699e+06
+    1198  United States of America  1995  6.710067e+06
+    1199  United States of America  1994  6.624836e+06
+    1200  United States of America  1993  6.532070e+06
+    1201  United States of America  1992  6.424934e+06
+    1202  United States of America  1991  6.315615e+06
+    1203  United States of America  1990  6.371001e+06
+    """
 
-print(greenhouse_data.isnull().sum())
+    # 5 - Check if there are any null values
 
-"""
-               Country or Area  Year         Value
-1194  United States of America  1999  7.071461e+06
-1195  United States of America  1998  7.032526e+06
-1196  United States of America  1997  6.968462e+06
-1197  United States of America  1996  6.907699e+06
-1198  United States of America  1995  6.710067e+06
-1199  United States of America  1994  6.624836e+06
-1200  United States of America  1993  6.532070e+06
-1201  United States of America  1992  6.424934e+06
-1202  United States of America  1991  6.315615e+06
-1203  United States of America  1990  6.371001e+06
-Country or Area    0
-Year               0
-Value              0
-dtype: int64
-
-No null values in any column
-"""
+    print(greenhouse_data.isnull().sum())
+
+    """
+                   Country or Area  Year         Value
+    1194  United States of America  1999  7.071461e+06
+    1195  United States of America  1998  7.032526e+06
+    1196  United States of America  1997  6.968462e+06
+    1197  United States of America  1996  6.907699e+06
+    1198  United States of America  1995  6.710067e+06
+    1199  United States of America  1994  6.624836e+06
+    1200  United States of America  1993  6.532070e+06
+    1201  United States of America  1992  6.424934e+06
+    1202  United States of America  1991  6.315615e+06
+    1203  United States of America  1990  6.371001e+06
+    Country or Area    0
+    Year               0
+    Value              0
+    dtype: int64
+
+    No null values in any column
+    """
 
-# 7- Store the DataFrame to a CSV file named 'file2.csv'
+    # 7- Store the DataFrame to a CSV file named 'file2.csv'
 
-greenhouse_data.to_csv('file2.csv')
\ No newline at end of file
+    export_csv_incremental(greenhouse_data, 'file2.csv')
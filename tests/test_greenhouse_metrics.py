@@ -0,0 +1,15 @@
+import pandas as pd
+import pytest
+
+import greenhouse_metrics as gm
+import self_practice as sp
+
+
+@pytest.mark.parametrize("window", [1, 3])
+def test_extend_country_metrics_matches_full_recompute(window):
+    full = sp.make_greenhouse_frame(2_800, seed=4)
+    old, new = full[full["Year"] < 2015], full[full["Year"] >= 2015]
+    metrics = gm.country_metrics(old.reset_index(drop=True), window=window)
+    extended = gm.extend_country_metrics(metrics, new, window=window)
+    expected = gm.country_metrics(full, window=window).loc[extended.index]
+    pd.testing.assert_frame_equal(extended, expected, check_dtype=False)
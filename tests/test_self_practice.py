@@ -0,0 +1,179 @@
+import functools
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import self_practice as sp
+
+
+def test_export_csv_incremental_without_slack_matches_export_csv(tmp_path):
+    df = sp.make_greenhouse_frame(3_000, seed=1)
+    sp.export_csv(df, str(tmp_path / "full.csv"))
+    sp.export_csv_incremental(df, str(tmp_path / "inc.csv"), block_rows=1_000)
+    assert (tmp_path / "inc.csv").read_bytes() == (tmp_path / "full.csv").read_bytes()
+
+    df.loc[5, "Value"] = df.loc[5, "Value"] * 1.37 + 0.001
+    sp.export_csv(df, str(tmp_path / "full.csv"))
+    sp.export_csv_incremental(df, str(tmp_path / "inc.csv"), block_rows=1_000)
+    assert (tmp_path / "inc.csv").read_bytes() == (tmp_path / "full.csv").read_bytes()
+
+
+def test_export_csv_incremental_rewrites_only_changed_blocks(tmp_path):
+    path = str(tmp_path / "out.csv")
+    df = sp.make_greenhouse_frame(13_000, seed=1)
+    export = functools.partial(sp.export_csv_incremental, block_rows=1_000, slack=64)
+    assert export(df, path)["blocks_written"] == 13
+
+    df.loc[5, "Value"] = df.loc[5, "Value"] * 1.37 + 0.001
+    assert export(df, path)["blocks_written"] == 1
+    assert export(df, path)["blocks_written"] == 0
+
+    back = pd.read_csv(path)
+    pd.testing.assert_frame_equal(back, df.astype({"Country or Area": str}), check_dtype=False)
+    loaded = sp.load_csv(path)
+    assert loaded["Country or Area"].astype(str).tolist() == df["Country or Area"].tolist()
+    assert loaded["Value"].tolist() == df["Value"].tolist()
+    assert sp.tail_csv(path, 3)["Value"].tolist() == df["Value"].tail(3).tolist()
+
+
+@pytest.mark.parametrize("by, columns", [
+    ("Country or Area", None),
+    (["Country or Area", "Year"], ["Value"]),
+])
+def test_groupby_agg_matches_pandas_when_spilling(by, columns):
+    df = sp.make_greenhouse_frame(20_000, seed=3)
+    df.loc[::7, "Value"] = np.nan
+    # max_groups far below the number of groups forces a spill on every chunk
+    result = sp.groupby_agg(df, by=by, columns=columns, chunksize=1_000,
+                            max_groups=5, partitions=4)
+    expected = (df.groupby(by, observed=True)[columns or ["Year", "Value"]]
+                .agg(list(sp.GROUPBY_AGGS)).sort_index())
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False,
+                                  check_index_type=False, check_categorical=False)
+
+
+def test_mmap_engine_matches_python_engine(tmp_path, monkeypatch):
+    # several scan windows, a blank line, and an int column that turns
+    # decimal past the sniffed sample
+    monkeypatch.setattr(sp, "MMAP_BLOCK_LINES", 500)
+    df = sp.make_greenhouse_frame(3_000, seed=5)
+    df["Count"] = np.arange(len(df))
+    lines = sp._format_block(df, 0, len(df), False, None).decode().split("\n")
+    lines[2_000] = lines[2_000].rsplit(",", 1)[0] + ",2.5"
+    lines.insert(1_200, "")
+    text = ",".join(sp._quote(df.columns)) + "\n" + "\n".join(lines)
+    lf, crlf = tmp_path / "lf.csv", tmp_path / "crlf.csv"
+    lf.write_bytes(text.encode())
+    crlf.write_bytes(text.replace("\n", "\r\n").encode())
+
+    expected = sp.load_csv(str(lf))
+    assert expected["Count"].dtype == np.float64
+    for path in (lf, crlf):
+        pd.testing.assert_frame_equal(sp.load_csv(str(path), engine="mmap"), expected,
+                                      check_categorical=False)
+
+
+def test_country_year_matrix_round_trip_with_gaps_and_null_countries():
+    df = pd.DataFrame({
+        "Country or Area": ["A", "A", "B", "B", None],
+        "Year": [2002, 2000, 2002, 2000, 2001],
+        "Value": [1.0, 2.0, 3.0, 4.0, 99.0],
+    })
+    matrix, countries, years = sp.to_country_year_matrix(df)
+    assert countries == {"A": 0, "B": 1}
+    assert years == {2000: 0, 2001: 1, 2002: 2}
+    np.testing.assert_array_equal(matrix, [[2.0, np.nan, 1.0], [4.0, np.nan, 3.0]])
+
+    back = sp.from_country_year_matrix(matrix, countries, years)
+    expected = df.dropna(subset=["Country or Area"])
+    pd.testing.assert_frame_equal(back.astype({"Country or Area": str}),
+                                  expected.reset_index(drop=True), check_dtype=False)
+
+
+def test_row_index_skips_blank_lines_across_blocks(tmp_path):
+    path = tmp_path / "rows.csv"
+    path.write_bytes(b"a,b\n1,2\n\n\n3,4\n5,6")
+    offsets = sp.build_row_index(str(path), block_size=3)
+    assert offsets.tolist() == [4, 10, 14, 17]
+    assert sp.read_rows(str(path))["a"].tolist() == [1, 3, 5]
+    assert sp.tail_csv(str(path), 1)["b"].tolist() == [6]
+
+
+def test_validation_during_parsing_matches_a_check_of_the_whole_frame(tmp_path, monkeypatch):
+    monkeypatch.setattr(sp, "MMAP_BLOCK_LINES", 300)
+    # injected: two negative values, a year out of range and a duplicate key
+    # in another scan window / byte range than its first occurrence
+    df = sp.make_greenhouse_frame(2_000, seed=6)
+    df.loc[[7, 1_500], "Value"] = -1.0
+    df.loc[1_234, "Year"] = 1980
+    df.loc[1_999, ["Country or Area", "Year"]] = df.loc[3, ["Country or Area", "Year"]]
+    path = str(tmp_path / "bad.csv")
+    sp.export_csv(df, path)
+
+    schema = {"columns": {"Year": {"min": 1990, "max": 2017}, "Value": {"min": 0}},
+              "unique": ["Country or Area", "Year"]}
+    expected = sp.Validator(schema).check(sp.load_csv(path), 0).report()
+    assert not expected["valid"]
+    assert expected["violations"]["Value: below 0"] == {"count": 2, "rows": [7, 1_500]}
+    assert expected["violations"]["Country or Area, Year: duplicate"]["rows"] == [1_999]
+    for kwargs in ({}, {"engine": "mmap"}, {"workers": 2}):
+        validator = sp.Validator(schema)
+        sp.load_csv(path, validator=validator, **kwargs)
+        assert validator.report() == expected
+
+
+def test_compact_round_trip_and_where_filters(tmp_path):
+    path = tmp_path / "green.csv"
+    sp.export_csv(sp.make_greenhouse_frame(5_000, seed=7), str(path))
+    df = sp.load_csv(str(path))
+    assert isinstance(df["Country or Area"].dtype, pd.CategoricalDtype)
+    compact = str(tmp_path / "green.ghc")
+    sp.write_compact(df, compact, block_rows=1_000)
+    pd.testing.assert_frame_equal(sp.read_compact(compact), df)
+
+    country = df["Country or Area"].iloc[2_500]
+    by_country = sp.read_compact(compact, where={"Country or Area": (country, country)})
+    pd.testing.assert_frame_equal(by_country, df[df["Country or Area"] == country])
+
+    by_year = sp.read_compact(compact, columns=["Value"], where={"Year": (2000, 2004)})
+    pd.testing.assert_frame_equal(by_year, df.loc[df["Year"].between(2000, 2004), ["Value"]])
+
+
+def _attach_in_child(name, results):
+    shared = sp.attach_frame(name)
+    results.put((shared.frame.copy(), shared._references(0)))
+    shared.detach()
+
+
+def test_shared_frame_across_a_spawned_process():
+    df = pd.DataFrame({"country": ["A", "B", "A"], "year": [2000, 2001, 2002],
+                       "when": pd.date_range("2020-01-01", periods=3)},
+                      index=pd.Index([100, 101, 102], name="row"))
+    shared = sp.publish_frame(df)
+    try:
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        child = ctx.Process(target=_attach_in_child, args=(shared.name, results))
+        child.start()
+        frame, refs = results.get(timeout=60)
+        child.join(60)
+        assert child.exitcode == 0
+        assert refs == 2
+        pd.testing.assert_frame_equal(frame, df, check_categorical=False, check_dtype=False)
+        assert shared._references(0) == 1
+    finally:
+        shared.detach()
+    with pytest.raises(FileNotFoundError):
+        sp.attach_frame(shared.name)
+
+
+def test_publish_frame_failure_leaves_no_blocks():
+    df = pd.DataFrame({"a": [1, 2], "b": [object(), object()]})
+    before = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+    with pytest.raises(TypeError):
+        sp.publish_frame(df, name="test_publish_failure")
+    after = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+    assert after == before
@@ -0,0 +1,88 @@
+import threading
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import visualization as vis
+
+FILES = {f"/{name}.csv": f"a,b\n{i},{i * 2}\n".encode() for i, name in enumerate("xyz")}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.client_address))
+        body = FILES.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag = f'"{len(body)}-{hash(body)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            self.server.not_modified += 1
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _stop(httpd):
+    if not httpd.stopped:
+        httpd.shutdown()
+        httpd.server_close()
+        httpd.stopped = True
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.requests, httpd.not_modified, httpd.stopped = [], 0, False
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, f"http://127.0.0.1:{httpd.server_address[1]}"
+    _stop(httpd)
+
+
+def test_fetch_datasets_caches_and_reuses_connections(server, tmp_path):
+    httpd, base = server
+    urls = [base + path for path in FILES]
+    paths = vis.fetch_datasets(urls, cache_dir=str(tmp_path), max_concurrency=1)
+    for path, url in zip(FILES, urls):
+        with open(paths[url], "rb") as f:
+            assert f.read() == FILES[path]
+    # one keep-alive connection serves every request
+    assert len({client for _, client in httpd.requests}) == 1
+
+    again = vis.fetch_datasets(urls, cache_dir=str(tmp_path))
+    assert again == paths
+    assert httpd.not_modified == len(urls)
+
+
+def test_fetch_datasets_missing_url_and_offline_miss(server, tmp_path):
+    _, base = server
+    with pytest.raises(urllib.error.HTTPError) as error:
+        vis.fetch_datasets([base + "/missing.csv"], cache_dir=str(tmp_path))
+    assert error.value.code == 404
+    with pytest.raises(FileNotFoundError):
+        vis.fetch_datasets([base + "/x.csv"], cache_dir=str(tmp_path), offline=True)
+
+
+def test_fetch_dataset_falls_back_to_the_cache(server, tmp_path):
+    httpd, base = server
+    path = vis.fetch_dataset(base + "/x.csv", cache_dir=str(tmp_path))
+    _stop(httpd)
+    assert vis.fetch_dataset(base + "/x.csv", cache_dir=str(tmp_path), timeout=2) == path
+    with pytest.raises(FileNotFoundError):
+        vis.fetch_dataset(base + "/y.csv", cache_dir=str(tmp_path), timeout=2)
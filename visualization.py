@@ -1,6 +1,676 @@
+import asyncio
+import hashlib
+import http.client
+import json
+import os
+import queue
+import sys
+import time
+import urllib.error
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
 import pandas as pd
 import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+# Dataset fetching: fetch_datasets() downloads many URLs concurrently from
+# asyncio, keeping keep-alive http.client connections per host for reuse (the
+# blocking calls run in the loop's thread pool). Bodies go to a content
+# addressed cache (objects/<sha256><ext>) with an index of the ETag and
+# Last-Modified of every URL; cached URLs are revalidated with If-None-Match /
+# If-Modified-Since, and offline=True serves from the cache only.
+
+DATASET_CACHE = "./datasets/.cache"
+METRO_URL = ("https://raw.githubusercontent.com/dphi-official/Datasets/master/"
+             "Standard_Metropolitan_Areas_Data-data.csv")
+
+
+def _read_index(cache_dir):
+    path = os.path.join(cache_dir, "index.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_index(cache_dir, index):
+    path = os.path.join(cache_dir, "index.json")
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(index, f, indent=1)
+    os.replace(f"{path}.tmp", path)
+
+
+def _cached_object(cache_dir, entry):
+    path = os.path.join(cache_dir, "objects", entry["object"])
+    return path if os.path.exists(path) else None
+
+
+def _store_object(cache_dir, url, body):
+    ext = os.path.splitext(urlsplit(url).path)[1]
+    name = hashlib.sha256(body).hexdigest() + ext
+    path = os.path.join(cache_dir, "objects", name)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(body)
+        os.replace(f"{path}.tmp", path)
+    return name, path
+
+
+def _get(conn, target, headers):
+    conn.request("GET", target, headers=headers)
+    response = conn.getresponse()
+    body = response.read()
+    return response.status, response.reason, response.headers, body, response.will_close
+
+
+class _ConnectionPool:
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self._idle = {}
+
+    def connect(self, scheme, netloc):
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(netloc, timeout=self.timeout)
+
+    def take(self, scheme, netloc):
+        idle = self._idle.get((scheme, netloc))
+        if idle:
+            return idle.pop(), True
+        return self.connect(scheme, netloc), False
+
+    def give(self, scheme, netloc, conn):
+        self._idle.setdefault((scheme, netloc), []).append(conn)
+
+    def close(self):
+        for conns in self._idle.values():
+            for conn in conns:
+                conn.close()
+        self._idle.clear()
+
+
+async def _fetch(url, pool, limit, cache_dir, index, max_redirects=5):
+    loop = asyncio.get_running_loop()
+    entry = index.get(url)
+    cached = entry and _cached_object(cache_dir, entry)
+    headers = {"Accept-Encoding": "identity"}
+    if cached:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    location = url
+    for _ in range(max_redirects + 1):
+        parts = urlsplit(location)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        async with limit:
+            conn, reused = pool.take(parts.scheme, parts.netloc)
+            try:
+                result = await loop.run_in_executor(None, _get, conn, target, headers)
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if not reused:
+                    raise
+                # the server dropped an idle keep-alive connection, retry on a new one
+                conn = pool.connect(parts.scheme, parts.netloc)
+                result = await loop.run_in_executor(None, _get, conn, target, headers)
+            status, reason, response_headers, body, closing = result
+            if closing:
+                conn.close()
+            else:
+                pool.give(parts.scheme, parts.netloc, conn)
+        if status in (301, 302, 303, 307, 308) and response_headers.get("Location"):
+            location = urljoin(location, response_headers["Location"])
+            continue
+        break
+    if status == 304 and cached:
+        return cached
+    if status != 200:
+        raise urllib.error.HTTPError(url, status, reason, response_headers, None)
+    name, path = _store_object(cache_dir, url, body)
+    index[url] = {"object": name, "etag": response_headers.get("ETag"),
+                  "last_modified": response_headers.get("Last-Modified")}
+    return path
+
+
+async def fetch_datasets_async(urls, cache_dir=DATASET_CACHE, offline=False,
+                               max_concurrency=8, timeout=30):
+    index = _read_index(cache_dir)
+    if offline:
+        paths = {}
+        for url in urls:
+            path = url in index and _cached_object(cache_dir, index[url])
+            if not path:
+                raise FileNotFoundError(f"{url} is not in the dataset cache")
+            paths[url] = path
+        return paths
+    os.makedirs(cache_dir, exist_ok=True)
+    pool = _ConnectionPool(timeout)
+    limit = asyncio.Semaphore(max_concurrency)
+    try:
+        results = await asyncio.gather(
+            *[_fetch(url, pool, limit, cache_dir, index) for url in urls],
+            return_exceptions=True)
+    finally:
+        pool.close()
+        _write_index(cache_dir, index)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return dict(zip(urls, results))
+
+
+def fetch_datasets(urls, **kwargs):
+    return asyncio.run(fetch_datasets_async(list(urls), **kwargs))
+
+
+def fetch_dataset(url, **kwargs):
+    # falls back to the cached copy when the server cannot be reached
+    try:
+        return fetch_datasets([url], **kwargs)[url]
+    except urllib.error.HTTPError:
+        raise
+    except (OSError, http.client.HTTPException):
+        return fetch_datasets([url], **{**kwargs, "offline": True})[url]
+
+
+# Density scatter: large point clouds are binned into a 2D histogram in one
+# vectorised pass and drawn as an image (log colour scale), and only points in
+# sparsely populated bins are drawn as markers, so outliers stay visible while
+# the draw cost stops growing with the row count. Scatter charts with more
+# than DENSITY_SCATTER_ROWS points switch to it in render_charts.
+
+DENSITY_SCATTER_ROWS = 100_000
+
+
+def _bin_range(values):
+    lo, hi = (float(values.min()), float(values.max())) if len(values) else (0.0, 1.0)
+    return (lo - 0.5, hi + 0.5) if lo == hi else (lo, hi)
+
+
+def density_scatter(ax, x, y, bins=256, outlier_max_count=2, max_outliers=5_000,
+                    cmap="viridis", log=True, seed=0, **style):
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    finite = np.isfinite(x) & np.isfinite(y)
+    x, y = x[finite], y[finite]
+    nx, ny = (bins, bins) if np.isscalar(bins) else bins
+    xr, yr = _bin_range(x), _bin_range(y)
+    # every point is binned once; the same cell numbers give the counts and
+    # the outlier lookup, so the two cannot disagree at bin edges
+    ix = np.clip(((x - xr[0]) / (xr[1] - xr[0]) * nx).astype(np.int64), 0, nx - 1)
+    iy = np.clip(((y - yr[0]) / (yr[1] - yr[0]) * ny).astype(np.int64), 0, ny - 1)
+    cells = ix * ny + iy
+    counts = np.bincount(cells, minlength=nx * ny)
+    outliers = np.flatnonzero(counts[cells] <= outlier_max_count)
+    counts = counts.reshape(nx, ny)
+    if len(outliers) > max_outliers:
+        outliers = np.sort(np.random.default_rng(seed).choice(outliers, max_outliers,
+                                                              replace=False))
+    dense = np.where(counts > outlier_max_count, counts, 0).T
+    norm = matplotlib.colors.LogNorm() if log and dense.any() else None
+    image = ax.imshow(np.ma.masked_equal(dense, 0), origin="lower", aspect="auto",
+                      extent=(*xr, *yr), cmap=cmap, norm=norm, interpolation="nearest")
+    style.setdefault("s", 6)
+    ax.scatter(x[outliers], y[outliers], **style)
+    return image
+
+
+# Line decimation: lttb() keeps n_out points chosen by Largest-Triangle-Three-
+# Buckets, which preserves peaks and the overall shape of the series. The
+# triangle areas are computed per bucket with NumPy, so the Python loop runs
+# once per kept point, not per input point. plot_line() decimates a series to
+# about two points per horizontal pixel of the axes, sorting by x first since
+# LTTB needs an ordered x; series that already fit are plotted unchanged.
+
+def lttb(x, y, n_out):
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+
+def plot_line(ax, x, y=None, width_px=None, points_per_pixel=2, **style):
+    if y is None:
+        x, y = np.arange(len(x)), x
+    x, y = _decimate(ax, x, y, width_px, points_per_pixel)
+    return ax.plot(x, y, **style)
+
+
+def _decimate(ax, x, y, width_px=None, points_per_pixel=2):
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    if width_px is None:
+        width_px = ax.get_window_extent().width
+    n_out = max(int(width_px * points_per_pixel), 3)
+    if len(x) > n_out:
+        finite = np.isfinite(x) & np.isfinite(y)
+        x, y = x[finite], y[finite]
+        if np.any(np.diff(x) < 0):
+            order = np.argsort(x, kind="stable")
+            x, y = x[order], y[order]
+        x, y = lttb(x, y, n_out)
+    return x, y
+
+
+# Chart templates: a ChartTemplate builds the styled figure, axes, title and
+# labels of a chart spec once and keeps its data artist; render() only swaps
+# the artist's data (set_offsets / set_data) and updates the limits. On
+# interactive backends that support blitting, the static background is cached
+# and only the data artist is redrawn for as long as the limits do not change;
+# other interactive canvases get a full draw_idle().
+# template_for() shares templates between specs that only differ in their
+# columns and labels, keeping the TEMPLATE_CACHE_SIZE most recently used ones.
+
+TEMPLATE_CACHE_SIZE = 8
+_TEMPLATES = {}
+
+
+def _padded_limits(values, margin=0.05):
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return None
+    lo, hi = float(values.min()), float(values.max())
+    pad = (hi - lo) * margin or 0.5
+    return lo - pad, hi + pad
+
+
+class ChartTemplate:
+
+    def __init__(self, spec, interactive=False):
+        self.spec = spec
+        self.interactive = interactive
+        if interactive:
+            self.fig = plt.figure(figsize=spec.get("figsize"))
+        else:
+            self.fig = Figure(figsize=spec.get("figsize"))
+            FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        style = spec.get("style", {})
+        if spec["kind"] == "scatter":
+            self.artist = self.ax.scatter([], [], **style)
+        else:
+            (self.artist,) = self.ax.plot([], [], **style)
+        self.blit = interactive and self.fig.canvas.supports_blit
+        self.artist.set_animated(self.blit)
+        self._limits = None
+        self.label(spec)
+
+    def label(self, spec):
+        self.spec = spec
+        self.ax.set_title(spec.get("title", ""))
+        self.ax.set_xlabel(spec.get("xlabel", ""))
+        self.ax.set_ylabel(spec.get("ylabel", ""))
+        self._background = None
+        return self
+
+    def set_data(self, x, y=None):
+        if y is None:
+            x, y = np.arange(len(x)), x
+        if self.spec["kind"] == "scatter":
+            x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+            self.artist.set_offsets(np.column_stack([x, y]))
+        else:
+            x, y = _decimate(self.ax, x, y)
+            self.artist.set_data(x, y)
+        return x, y
+
+    def render(self, x, y=None, path=None, fixed_limits=False, **savefig_kwargs):
+        x, y = self.set_data(x, y)
+        rescaled = False
+        if not fixed_limits or self._limits is None:
+            limits = (_padded_limits(x), _padded_limits(y))
+            if None not in limits and limits != self._limits:
+                self.ax.set_xlim(*limits[0])
+                self.ax.set_ylim(*limits[1])
+                self._limits, rescaled = limits, True
+        if self.blit:
+            canvas = self.fig.canvas
+            if self._background is None or rescaled:
+                canvas.draw()
+                self._background = canvas.copy_from_bbox(self.fig.bbox)
+            canvas.restore_region(self._background)
+            self.ax.draw_artist(self.artist)
+            canvas.blit(self.fig.bbox)
+            canvas.flush_events()
+        elif self.interactive:
+            self.fig.canvas.draw_idle()
+            self.fig.canvas.flush_events()
+        if path:
+            # animated artists are left out of a normal draw
+            self.artist.set_animated(False)
+            self.fig.savefig(path, **savefig_kwargs)
+            self.artist.set_animated(self.blit)
+        return self
+
+
+def template_for(spec, interactive=False):
+    key = json.dumps([spec["kind"], spec.get("figsize"), spec.get("style", {}), interactive],
+                     sort_keys=True, default=str)
+    template = _TEMPLATES.pop(key, None)
+    if template is None:
+        template = ChartTemplate(spec, interactive)
+    else:
+        template.label(spec)
+    # dicts keep insertion order, so the first key is the least recently used
+    _TEMPLATES[key] = template
+    while len(_TEMPLATES) > TEMPLATE_CACHE_SIZE:
+        evicted = _TEMPLATES.pop(next(iter(_TEMPLATES)))
+        if evicted.interactive:
+            plt.close(evicted.fig)
+    return template
+
+
+# Streaming: stream_plot() feeds rows from a generator, iterable or
+# queue.Queue into a ChartTemplate. Only the last `maxlen` points are kept, in a
+# ring buffer of preallocated arrays, and the chart is redrawn at most once per
+# `min_interval` seconds (plus once at the end). The limits only change when
+# new points fall outside them, so blitting keeps the cached background. An
+# interactive stream opens its window before the first row arrives and leaves it
+# open afterwards; the returned template owns the pyplot figure, so close it
+# with plt.close(template.fig) when done.
+
+class _RingBuffer:
+
+    def __init__(self, maxlen):
+        self.x = np.empty(maxlen, dtype=np.float64)
+        self.y = np.empty(maxlen, dtype=np.float64)
+        self.start = self.size = 0
+
+    def extend(self, x, y):
+        maxlen = len(self.x)
+        x, y = x[-maxlen:], y[-maxlen:]
+        pos = (self.start + self.size) % maxlen
+        idx = (pos + np.arange(len(x))) % maxlen
+        self.x[idx], self.y[idx] = x, y
+        overflow = max(self.size + len(x) - maxlen, 0)
+        self.start = (self.start + overflow) % maxlen
+        self.size = min(self.size + len(x), maxlen)
+
+    def view(self):
+        idx = (self.start + np.arange(self.size)) % len(self.x)
+        return self.x[idx], self.y[idx]
+
+
+def _stream_rows(item, spec, count):
+    # a row is a y value, an (x, y) pair, a dict / Series keyed by the spec's
+    # columns, or a whole DataFrame chunk
+    if isinstance(item, pd.DataFrame):
+        y = item[spec["y"]].to_numpy(dtype=np.float64)
+        x = item[spec["x"]].to_numpy(dtype=np.float64) if spec.get("x") else None
+    elif isinstance(item, (dict, pd.Series)):
+        y = np.array([item[spec["y"]]], dtype=np.float64)
+        x = np.array([item[spec["x"]]], dtype=np.float64) if spec.get("x") else None
+    elif np.ndim(item) == 1 and len(item) == 2:
+        x, y = np.array([item[0]], dtype=np.float64), np.array([item[1]], dtype=np.float64)
+    else:
+        x, y = None, np.atleast_1d(np.asarray(item, dtype=np.float64))
+    if x is None:
+        x = np.arange(count, count + len(y), dtype=np.float64)
+    return x, y
+
+
+def _stream_items(source, timeout):
+    # yields None whenever a queue has been idle for `timeout` so the caller
+    # can still redraw; a None put on the queue ends the stream
+    if not isinstance(source, queue.Queue):
+        yield from source
+        return
+    while True:
+        try:
+            item = source.get(timeout=timeout)
+        except queue.Empty:
+            yield None
+            continue
+        if item is None:
+            return
+        yield item
+
+
+def stream_plot(spec, source, maxlen=10_000, min_interval=0.1, interactive=True, path=None):
+    template = ChartTemplate(spec, interactive=interactive)
+    if interactive:
+        template.fig.show()
+    buffer = _RingBuffer(maxlen)
+    count, last_draw, drawn = 0, float("-inf"), 0
+
+    def redraw():
+        x, y = buffer.view()
+        lim_x, lim_y = template.ax.get_xlim(), template.ax.get_ylim()
+        inside = drawn and (lim_x[0] <= x.min() and x.max() <= lim_x[1]
+                            and lim_y[0] <= y.min() and y.max() <= lim_y[1])
+        template.render(x, y, fixed_limits=bool(inside))
+
+    for item in _stream_items(source, min_interval):
+        if item is not None:
+            x, y = _stream_rows(item, spec, count)
+            buffer.extend(x, y)
+            count += len(y)
+        if buffer.size and count > drawn and time.perf_counter() - last_draw >= min_interval:
+            redraw()
+            last_draw, drawn = time.perf_counter(), count
+    if buffer.size and count > drawn:
+        redraw()
+    if path:
+        template.render(*buffer.view(), path=path, fixed_limits=True)
+    return template
+
+
+# Batch rendering: CHARTS describes every chart of this walkthrough. The charts
+# are drawn on the Agg backend (a bare Figure, no pyplot state) in a process
+# pool and saved as PNG/SVG, with a manifest.json recording the files, render
+# time and cache key of each chart. The key hashes the plotted columns, the
+# chart spec, the formats and the matplotlib version, so unchanged charts are
+# skipped on the next run.
+
+CHARTS = [
+    {"name": "scatter_crime_senior", "kind": "scatter", "x": "crime_rate", "y": "percent_senior",
+     "title": "Plotting the scatter plot between crime rate and percent senior variables"},
+    {"name": "scatter_senior_crime", "kind": "scatter", "x": "percent_senior", "y": "crime_rate",
+     "title": "Plot of Crime Rate vs Percent Senior", "xlabel": "Percent Senior",
+     "ylabel": "Crime Rate"},
+    {"name": "line_workforce_income", "kind": "line", "x": "work_force", "y": "income",
+     "title": "Plot a line chart", "xlabel": "Work Force", "ylabel": "Income"},
+    {"name": "line_workforce", "kind": "line", "x": None, "y": "work_force",
+     "title": "Line chart workforce variable"},
+    {"name": "line_workforce_income_wide", "kind": "line", "x": "work_force", "y": "income",
+     "xlabel": "Work Force", "ylabel": "Income", "figsize": (12, 5)},
+    {"name": "line_workforce_income_styled", "kind": "line", "x": "work_force", "y": "income",
+     "xlabel": "Work Force", "ylabel": "Income",
+     "style": {"linestyle": "--", "marker": "o", "color": "r"}},
+]
+
+
+def _draw(ax, spec, columns):
+    x = columns[spec["x"]] if spec.get("x") else None
+    y = columns[spec["y"]]
+    style = spec.get("style", {})
+    if spec["kind"] == "density" or (spec["kind"] == "scatter" and len(y) > DENSITY_SCATTER_ROWS):
+        density_scatter(ax, x, y, **spec.get("density", {}), **style)
+    elif spec["kind"] == "scatter":
+        ax.scatter(x, y, **style)
+    elif spec["kind"] == "hist":
+        ax.hist(y[np.isfinite(y)], **style)
+    else:
+        plot_line(ax, y if x is None else x, None if x is None else y, **style)
+    ax.set_title(spec.get("title", ""))
+    ax.set_xlabel(spec.get("xlabel", ""))
+    ax.set_ylabel(spec.get("ylabel", ""))
+
+
+def _render_chart(spec, columns, out_dir, formats, dpi):
+    start = time.perf_counter()
+    fig = Figure(figsize=spec.get("figsize"))
+    FigureCanvasAgg(fig)
+    _draw(fig.add_subplot(), spec, columns)
+    files = []
+    for fmt in formats:
+        path = os.path.join(out_dir, f"{spec['name']}.{fmt}")
+        fig.savefig(path, format=fmt, dpi=dpi)
+        files.append(path)
+    return {"files": files, "seconds": time.perf_counter() - start}
+
+
+def _chart_key(spec, columns, formats, dpi):
+    digest = hashlib.sha256(json.dumps([spec, list(formats), dpi, matplotlib.__version__],
+                                       sort_keys=True, default=str).encode())
+    for name in sorted(columns):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(columns[name]).tobytes())
+    return digest.hexdigest()
+
+
+def _chart_columns(data, spec):
+    names = [spec[axis] for axis in ("x", "y") if spec.get(axis)]
+    return {name: data[name].to_numpy() for name in names}
+
+
+def render_charts(data, out_dir="charts", charts=CHARTS, formats=("png", "svg"),
+                  workers=None, dpi=100):
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    jobs = {}
+    for spec in charts:
+        columns = _chart_columns(data, spec)
+        key = _chart_key(spec, columns, formats, dpi)
+        done = manifest.get(spec["name"])
+        if done and done["key"] == key and all(os.path.exists(p) for p in done["files"]):
+            manifest[spec["name"]] = {**done, "cached": True}
+            continue
+        jobs[spec["name"]] = (key, spec, columns)
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {name: pool.submit(_render_chart, spec, columns, out_dir, formats, dpi)
+                       for name, (key, spec, columns) in jobs.items()}
+            for name, future in futures.items():
+                manifest[name] = {**future.result(), "key": jobs[name][0], "cached": False}
+    with open(f"{manifest_path}.tmp", "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    return manifest
+
+
+# Pairwise analysis: PairwiseStats keeps the pairwise-complete sums of a set
+# of columns (rows where both values are present, as DataFrame.corr/cov do) as
+# k x k matrices built with a few matrix products, so cov() and corr() for
+# every pair come from one vectorized call. add_column() only computes the new
+# row and column. scatter_matrix() renders one panel per pair (a histogram on
+# the diagonal) through render_charts, so panels are drawn in worker processes
+# and cached per pair in the manifest.
+
+METRO_COLUMNS = ("land_area", "percent_city", "percent_senior", "physicians", "hospital_beds",
+                 "graduates", "work_force", "income", "region", "crime_rate")
+
+
+class PairwiseStats:
+
+    def __init__(self, data, columns=METRO_COLUMNS):
+        self.columns = []
+        self.values = np.empty((len(data), 0))
+        self.mask = np.empty((len(data), 0))
+        # count, sum, sum of squares and cross products; stats[:, i, j] only
+        # counts the rows where columns i and j are both present
+        self.stats = np.empty((4, 0, 0))
+        self.add_columns(data, columns)
+
+    @staticmethod
+    def _blocks(a, a_mask, b, b_mask):
+        return np.stack([a_mask.T @ b_mask, a.T @ b_mask, (a * a).T @ b_mask, a.T @ b])
+
+    def add_columns(self, data, columns):
+        columns = [c for c in columns if c not in self.columns]
+        if not columns:
+            return self
+        new = data[list(columns)].to_numpy(dtype=np.float64, na_value=np.nan)
+        mask = np.isfinite(new)
+        # centring on the column mean leaves the statistics unchanged but keeps
+        # the sums of squares small
+        with np.errstate(invalid="ignore"):
+            mean = np.nan_to_num(np.nanmean(np.where(mask, new, np.nan), axis=0))
+        new, mask = np.where(mask, new - mean, 0.0), mask.astype(np.float64)
+        top = self._blocks(self.values, self.mask, new, mask)
+        self.values = np.hstack([self.values, new])
+        self.mask = np.hstack([self.mask, mask])
+        bottom = self._blocks(new, mask, self.values, self.mask)
+        self.stats = np.concatenate([np.concatenate([self.stats, top], axis=2), bottom], axis=1)
+        self.columns += columns
+        return self
+
+    def add_column(self, name, values):
+        return self.add_columns(pd.DataFrame({name: values}), [name])
+
+    def _frame(self, matrix):
+        return pd.DataFrame(matrix, index=self.columns, columns=self.columns)
+
+    def _centered(self):
+        n, sums, squares, products = self.stats
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return n, squares - sums ** 2 / n, products - sums * sums.T / n
+
+    def count(self):
+        return self._frame(self.stats[0].astype(np.int64))
+
+    def cov(self, ddof=1):
+        n, _, products = self._centered()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self._frame(np.where(n > ddof, products / (n - ddof), np.nan))
+
+    def corr(self):
+        n, squares, products = self._centered()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # squares[i, j] is column i over the rows it shares with column j
+            corr = products / np.sqrt(squares * squares.T)
+        return self._frame(np.where(n > 1, np.clip(corr, -1, 1), np.nan))
+
+
+def _pair_specs(stats, columns):
+    corr = stats.corr()
+    specs = []
+    for y in columns:
+        for x in columns:
+            if x == y:
+                specs.append({"name": f"pair_{y}", "kind": "hist", "y": y, "title": y,
+                              "style": {"bins": 20}})
+            else:
+                specs.append({"name": f"pair_{y}_{x}", "kind": "scatter", "x": x, "y": y,
+                              "title": f"r = {corr.at[y, x]:.2f}", "xlabel": x, "ylabel": y,
+                              "style": {"s": 8}})
+    return specs
+
+
+def scatter_matrix(data, columns=METRO_COLUMNS, out_dir="charts/scatter_matrix", stats=None,
+                   formats=("png",), workers=None, dpi=100):
+    columns = list(columns)
+    if stats is None:
+        stats = PairwiseStats(data, columns)
+    else:
+        stats.add_columns(data, columns)
+    manifest = render_charts(data, out_dir=out_dir, charts=_pair_specs(stats, columns),
+                             formats=formats, workers=workers, dpi=dpi)
+    return stats, manifest
+
 
 # Data Visualization in Python with `Matplotlib` and `Seaborn`
 
@@ -54,131 +724,138 @@ visualizations in Python. It is useful for those working with `Python` and `NumP
     of the axes.
 """
 
-# 1 - load the dataset 
+if __name__ == "__main__":
+    # 1 - load the dataset 
 
-x = pd.read_csv("https://raw.githubusercontent.com/dphi-official/Datasets/master/Standard_Metropolitan_Areas_Data-data.csv") 
+    # downloaded once into ./datasets/.cache and revalidated on later runs, the
+    # cached copy is used when there is no network access
+    x = pd.read_csv(fetch_dataset(METRO_URL))
 
-# or 
-x = pd.read_csv('./datasets/Standard_Metropolitan_Areas_Data-data.csv')
+    # python visualization.py --batch renders every chart of this walkthrough
+    # headlessly (Agg) into ./charts instead of showing them one by one
+    if "--batch" in sys.argv[1:]:
+        for name, entry in render_charts(x).items():
+            print(name, "cached" if entry["cached"] else "rendered", *entry["files"])
+        sys.exit()
 
-# 2 - check what all variables/fields are there in the dataset
-print(x.head())
+    # 2 - check what all variables/fields are there in the dataset
+    print(x.head())
 
-"""
-   land_area  percent_city  percent_senior  physicians  ...  work_force  income  region  crime_rate
-0       1384          78.1            12.3       25627  ...      4083.9   72100       1       75.55
-1       3719          43.9             9.4       13326  ...      3305.9   54542       2       56.03
-2       3553          37.4            10.7        9724  ...      2066.3   33216       1       41.32
-3       3916          29.9             8.8        6402  ...      1966.7   32906       2       67.38
-4       2480          31.5            10.5        8502  ...      1514.5   26573       4       80.19
-
-[5 rows x 10 columns]
-"""
+    """
+       land_area  percent_city  percent_senior  physicians  ...  work_force  income  region  crime_rate
+    0       1384          78.1            12.3       25627  ...      4083.9   72100       1       75.55
+    1       3719          43.9             9.4       13326  ...      3305.9   54542       2       56.03
+    2       3553          37.4            10.7        9724  ...      2066.3   33216       1       41.32
+    3       3916          29.9             8.8        6402  ...      1966.7   32906       2       67.38
+    4       2480          31.5            10.5        8502  ...      1514.5   26573       4       80.19
 
-print(x.columns)
-"""
-Index(['land_area', 'percent_city', 'percent_senior', 'physicians',
-       'hospital_beds', 'graduates', 'work_force', 'income', 'region',
-       'crime_rate'],
-      dtype='object')
-"""
-# 3 - Scatter Plot using `Matplotlib`
+    [5 rows x 10 columns]
+    """
 
-"""
-- A scatter plot (aka scatter chart, scatter graph) uses dots to represent values for
-    two different numeric variables. 
-- The position of each dot on the horizontal and vertical axis indicates values for an
-    individual data point. 
-- Scatter plots are used to observe relationships between variables.
+    print(x.columns)
+    """
+    Index(['land_area', 'percent_city', 'percent_senior', 'physicians',
+           'hospital_beds', 'graduates', 'work_force', 'income', 'region',
+           'crime_rate'],
+          dtype='object')
+    """
+    # 3 - Scatter Plot using `Matplotlib`
 
-To create a scatter plot in `Matplotlib` we can use the `.scatter()` method:
-"""
+    """
+    - A scatter plot (aka scatter chart, scatter graph) uses dots to represent values for
+        two different numeric variables. 
+    - The position of each dot on the horizontal and vertical axis indicates values for an
+        individual data point. 
+    - Scatter plots are used to observe relationships between variables.
 
-# 3-1 Create a scatter plot between crime rate and percent senior variables
-plt.scatter(x.crime_rate, x.percent_senior) # Plotting the scatter plot
-plt.title('Plotting the scatter plot between crime rate and percent senior variables') 
-plt.show() # Showing the figure
+    To create a scatter plot in `Matplotlib` we can use the `.scatter()` method:
+    """
 
-"""
-       Applications of Scatter Plot:
+    # 3-1 Create a scatter plot between crime rate and percent senior variables
+    plt.scatter(x.crime_rate, x.percent_senior) # Plotting the scatter plot
+    plt.title('Plotting the scatter plot between crime rate and percent senior variables') 
+    plt.show() # Showing the figure
 
-A scatter plot can also be useful for identifying other patterns in data. 
-- We can divide data points into groups based on how closely sets of points cluster 
-    together. 
-- Scatter plots can also show if there are any unexpected gaps in the data and if there
-    are any outlier points.(Look at the 2 points away from rest of the data in the scatter plot. Those are outliers.)
+    """
+           Applications of Scatter Plot:
 
-This can be useful if we want to segment the data into different parts, like categorising
-    users into different groups.
-    
-"""
+    A scatter plot can also be useful for identifying other patterns in data. 
+    - We can divide data points into groups based on how closely sets of points cluster 
+        together. 
+    - Scatter plots can also show if there are any unexpected gaps in the data and if there
+        are any outlier points.(Look at the 2 points away from rest of the data in the scatter plot. Those are outliers.)
 
-# 3-2 Adding titles and labels
+    This can be useful if we want to segment the data into different parts, like categorising
+        users into different groups.
 
-plt.scatter(x.percent_senior, x.crime_rate)
+    """
 
-plt.title('Plot of Crime Rate vs Percent Senior') # Adding a title to the plot
-plt.xlabel("Percent Senior") # Adding the label for the horizontal axis
-plt.ylabel("Crime Rate") # Adding the label for the vertical axis
-plt.show()
+    # 3-2 Adding titles and labels
 
-# 4 - Line Chart using `Matplotlib`
+    plt.scatter(x.percent_senior, x.crime_rate)
 
-"""
-A line chart is used to represent data over a continuous time span. It is generally used
-    to show trend of a measure (or a variable) over time. Data values are plotted as 
-    points that are connected using line segments.
+    plt.title('Plot of Crime Rate vs Percent Senior') # Adding a title to the plot
+    plt.xlabel("Percent Senior") # Adding the label for the horizontal axis
+    plt.ylabel("Crime Rate") # Adding the label for the vertical axis
+    plt.show()
 
-In Matplotlib we can create a line chart by calling the plot method.
+    # 4 - Line Chart using `Matplotlib`
 
-plot() is a versatile command, and will take an arbitrary number of arguments.
+    """
+    A line chart is used to represent data over a continuous time span. It is generally used
+        to show trend of a measure (or a variable) over time. Data values are plotted as 
+        points that are connected using line segments.
 
+    In Matplotlib we can create a line chart by calling the plot method.
 
-     Applications of Line Chart:
+    plot() is a versatile command, and will take an arbitrary number of arguments.
 
-Using a line chart one can see the pattern of any dependent variable over time like share
-price, weather recordings (like temperature, precipitation or humidity), etc.
 
-"""
+         Applications of Line Chart:
 
-plt.plot(x.work_force, x.income) # 2 arguments: X and Y points
-plt.title('Plot a line chart')
-plt.xlabel("Work Force") # Adding the label for the horizontal axis
-plt.ylabel("Income")
-plt.show()
+    Using a line chart one can see the pattern of any dependent variable over time like share
+    price, weather recordings (like temperature, precipitation or humidity), etc.
 
-"""
-Because it is a line chart, `matplotlib` automatically draws a line to connect each
-pair of consecutive points that represent Cartesian coordinates on the graph. We can
-also make a graph with a single input argument
-"""
-plt.plot(x.work_force) # 1 argument
-plt.title('Line chart workforce variable')
-plt.show()
+    """
 
-# 4-1  Changing the size of the plot
+    plt.plot(x.work_force, x.income) # 2 arguments: X and Y points
+    plt.title('Plot a line chart')
+    plt.xlabel("Work Force") # Adding the label for the horizontal axis
+    plt.ylabel("Income")
+    plt.show()
 
-"""
-The size of the figure that contains the graph can be varied with the `figsize` 
-argument as follows:
+    """
+    Because it is a line chart, `matplotlib` automatically draws a line to connect each
+    pair of consecutive points that represent Cartesian coordinates on the graph. We can
+    also make a graph with a single input argument
+    """
+    plt.plot(x.work_force) # 1 argument
+    plt.title('Line chart workforce variable')
+    plt.show()
 
-```
-plt.figure(figsize=(new_width_pixels, new_height_pixels))
-"""
+    # 4-1  Changing the size of the plot
+
+    """
+    The size of the figure that contains the graph can be varied with the `figsize` 
+    argument as follows:
+
+    ```
+    plt.figure(figsize=(new_width_pixels, new_height_pixels))
+    """
 
-plt.figure(figsize=(12,5)) # 12x5 plot
+    plt.figure(figsize=(12,5)) # 12x5 plot
 
-plt.plot(x.work_force, x.income) 
-plt.xlabel("Work Force") 
-plt.ylabel("Income")
-plt.show()
+    plt.plot(x.work_force, x.income) 
+    plt.xlabel("Work Force") 
+    plt.ylabel("Income")
+    plt.show()
 
-# 4-2  Formatting the style of your plot
+    # 4-2  Formatting the style of your plot
 
-# Specify the keyword args linestyle and/or marker in your call to plot.
-# For example, using a dashed line and red circle markers:
+    # Specify the keyword args linestyle and/or marker in your call to plot.
+    # For example, using a dashed line and red circle markers:
 
-plt.plot(x.work_force, x.income, linestyle='--', marker='o', color='r')
-plt.xlabel("Work Force") 
-plt.ylabel("Income")
-plt.show()
+    plt.plot(x.work_force, x.income, linestyle='--', marker='o', color='r')
+    plt.xlabel("Work Force") 
+    plt.ylabel("Income")
+    plt.show()